@@ -0,0 +1,37 @@
+# /backend/__init__.py
+
+from flask import Flask
+from flask_cors import CORS
+
+from .config import CORS_ORIGINS, ENDPOINTS, MAX_BODY_BYTES, SERVE_PAGES
+
+__all__ = ["create_app"]
+
+
+def create_app(endpoints=None):
+    """Build the Flask app with the given subset of "contact" / "request-service".
+
+    All apps created in one process share the pool, limiter and caches in
+    backend.core, so one process per host can serve every endpoint.
+    """
+    from .routes import admin_bp, body_too_large, contact_bp, pages, pages_bp, service_bp, stats_bp
+
+    blueprints = {"contact": contact_bp, "request-service": service_bp}
+    endpoints = ENDPOINTS if endpoints is None else tuple(endpoints)
+    unknown = set(endpoints) - set(blueprints)
+    if unknown:
+        raise ValueError(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_BODY_BYTES
+    app.register_error_handler(413, body_too_large)
+    if CORS_ORIGINS:
+        CORS(app, origins="*" if "*" in CORS_ORIGINS else list(CORS_ORIGINS))
+    for name in endpoints:
+        app.register_blueprint(blueprints[name])
+    if SERVE_PAGES:
+        pages.load()  # read, fill in endpoint URLs and precompress once per process
+        app.register_blueprint(pages_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(admin_bp)
+    return app
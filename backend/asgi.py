@@ -0,0 +1,389 @@
+# /backend/asgi.py
+#
+# ASGI variant of the form endpoints, for running under uvicorn:
+#
+#   uvicorn backend.asgi:app --host 0.0.0.0 --port 5000
+#
+# Same validation, spam checks and JSON responses as the Flask app, but the
+# MX lookup, cooldown lookup and INSERT are awaited (dnspython asyncresolver,
+# aiomysql pool), so one process can hold thousands of in-flight submissions.
+# With STORAGE=sqlite there is no pool: inserts are awaited on the SQLite
+# writer thread's futures and cooldown reads run in a worker thread.
+
+import asyncio
+import contextlib
+import functools
+import json
+import time
+
+import aiomysql
+import mysql.connector
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from werkzeug.http import http_date
+
+from .config import (
+    DB_HOST, DB_USER, DB_PASS, DB_NAME, DB_POOL_RECYCLE, EMAIL_COOLDOWN, INCLUDE_RECENT_ENTRIES,
+    ASYNC_POOL_MIN, ASYNC_POOL_MAX, MAX_BODY_BYTES, SPAM_MAX_LINKS, CORS_ORIGINS, STORAGE,
+)
+from .core import (
+    CONTACT_TABLE, SERVICE_TABLE, SPAM_TEXT_FIELDS, ip_limiter, ip_blocklist, disposable_domains, mx_cache,
+    email_cooldowns, cooldown_message, record_submission, recent_entries, is_known_duplicate, remember_content,
+    notifier, idempotency as idempotency_store, storage, archiver, warm,
+)
+from . import idempotency
+from .forms import FormError, parse_contact, parse_service_request
+from .notifications import OUTBOX_INSERT
+from .rate_limiter import SlidingWindowLimiter
+from .spam_filter import Submission, build_filter
+
+db_pool = None  # aiomysql pool, created at startup (STORAGE=mysql)
+
+
+class BodyTooLarge(Exception):
+    """Request body over MAX_BODY_BYTES; answered with 413."""
+
+
+class FormJSONResponse(JSONResponse):
+    """JSON response that serializes dates the way Flask's jsonify does."""
+
+    def render(self, content):
+        return json.dumps(content, ensure_ascii=False, default=http_date).encode("utf-8")
+
+
+def error(message, status):
+    return FormJSONResponse({"status": "error", "message": message}, status_code=status)
+
+
+def duplicate():
+    return FormJSONResponse({
+        "status": "duplicate",
+        "message": "⚠️ This message was already received earlier. Please wait for a response."
+    })
+
+
+# --- Database ---
+def startup():
+    """Same startup as the gunicorn workers: schema check, index warm-up, background workers.
+
+    Inserts go straight to the database here, so the write-behind queue is not started.
+    """
+    storage.check()
+    warm(start_write_behind=False)
+    archiver.start()  # no-op unless RETENTION_DAYS is set
+    notifier.start()  # delivers the outbox rows committed with each insert
+
+
+def shutdown():
+    notifier.stop()
+    archiver.stop()
+    storage.close()  # SQLite: commits what the writer still has queued
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    global db_pool
+    await asyncio.to_thread(startup)
+    try:
+        if STORAGE != "sqlite":
+            db_pool = await aiomysql.create_pool(
+                host=DB_HOST, user=DB_USER, password=DB_PASS, db=DB_NAME,
+                minsize=ASYNC_POOL_MIN, maxsize=ASYNC_POOL_MAX,
+                pool_recycle=DB_POOL_RECYCLE, autocommit=True,
+            )
+        try:
+            yield
+        finally:
+            if db_pool is not None:
+                db_pool.close()
+                await db_pool.wait_closed()
+    finally:
+        await asyncio.to_thread(shutdown)
+
+
+async def fetch_last_submission(table, email):
+    if db_pool is None:
+        return await asyncio.to_thread(storage.last_submission, table, email)
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(f"SELECT MAX(created_at) FROM {table} WHERE email = %s", (email,))
+            row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def insert_row(table, row, key_row=None):
+    """INSERT one row (and its notification outbox rows, in one transaction); returns its id,
+    or None if it hit a unique key (duplicate). The outbox rows are delivered by the notifier
+    workers started in lifespan(). `key_row` (key digest, request hash, status, body) saves an
+    Idempotency-Key in the same transaction; raises idempotency.KeyTaken if it was saved first.
+    """
+    if db_pool is None:
+        enqueue = notifier.enqueue if key_row is None else idempotency_store.writer(*key_row, notifier.enqueue)
+        return await asyncio.wrap_future(storage.submit(table, row, enqueue))
+    columns = ", ".join(row)
+    placeholders = ", ".join(["%s"] * len(row))
+    async with db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await conn.begin()
+            try:
+                await cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(row.values()))
+                row_id = cursor.lastrowid
+                if notifier.enabled:
+                    await cursor.executemany(OUTBOX_INSERT, notifier.outbox_rows(table, [row], [row_id]))
+                if key_row is not None:
+                    await save_key(cursor, key_row)
+                await conn.commit()
+            except aiomysql.IntegrityError as e:
+                await conn.rollback()
+                if e.args and e.args[0] == 1062:
+                    return None
+                raise
+            except BaseException:
+                await conn.rollback()
+                raise
+            return row_id
+
+
+async def save_key(cursor, key_row):
+    try:
+        for sql, params in idempotency_store.statements(*key_row):
+            await cursor.execute(sql, params)
+    except aiomysql.IntegrityError as e:
+        if e.args and e.args[0] == 1062:
+            idempotency_store.taken()
+            raise idempotency.KeyTaken() from e
+        raise
+
+
+# --- Helpers ---
+def get_client_ip(request):
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+def wants_recent_entries(request):
+    return INCLUDE_RECENT_ENTRIES or request.query_params.get("recent") == "1"
+
+
+async def read_body(request):
+    """Raw body (read once, kept on request.state); stops reading once MAX_BODY_BYTES is exceeded."""
+    if hasattr(request.state, "body"):
+        return request.state.body
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BODY_BYTES:
+        raise BodyTooLarge()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BODY_BYTES:
+            raise BodyTooLarge()
+    request.state.body = bytes(body)
+    return request.state.body
+
+
+async def read_json(request):
+    """Decoded JSON body (None if malformed)."""
+    body = await read_body(request)
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+# --- Spam checks (same pipeline as core.spam_filters, with awaited limiter / cooldown / MX) ---
+async def ip_allowed(submission):
+    if isinstance(ip_limiter, SlidingWindowLimiter):
+        return ip_limiter.hit(submission.ip)  # in-memory, O(1): no need to leave the loop
+    return await asyncio.to_thread(ip_limiter.hit, submission.ip)
+
+
+async def cooldown_ok(submission):
+    now = time.time()
+    last_time = await email_cooldowns[submission.table].last_submission_async(
+        submission.email, fetch_last_submission, now)
+    return last_time is None or now - last_time >= EMAIL_COOLDOWN
+
+
+async def has_mx(submission):
+    return await mx_cache.has_mx_async(submission.domain)
+
+
+spam_filters = {
+    table: build_filter(
+        table, text_fields, ip_blocklist, disposable_domains, SPAM_MAX_LINKS,
+        ip_allowed, cooldown_ok, has_mx=has_mx if table == CONTACT_TABLE else None,
+        cooldown_message=cooldown_message(table),
+    )
+    for table, text_fields in SPAM_TEXT_FIELDS.items()
+}
+
+
+async def spam_check(request, table, data, row):
+    rejection = await spam_filters[table].run_async(Submission(table, get_client_ip(request), data, row))
+    if rejection is not None:
+        return error(rejection.message, rejection.status)
+    return None
+
+
+def invalid(request, e):
+    """400 for a payload that failed schema validation (final: stored for its Idempotency-Key)."""
+    request.state.final = True
+    return error(e.message, 400)
+
+
+def in_progress():
+    return error("A request with this Idempotency-Key is already in progress.", 409)
+
+
+def storable(request, status):
+    return status == 200 or (status == 400 and getattr(request.state, "final", False))
+
+
+def replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return error("This Idempotency-Key was already used with a different request.", 422)
+    return Response(stored.body, status_code=stored.status, media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"})
+
+
+def idempotent(view):
+    """Idempotency-Key support, as routes.idempotent; memory hits never leave the event loop."""
+    @functools.wraps(view)
+    async def wrapper(request):
+        key = request.headers.get("idempotency-key")
+        if key is None:
+            return await view(request)
+        key = key.strip()
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return error("Invalid Idempotency-Key header.", 400)
+        try:
+            body = await read_body(request)
+        except BodyTooLarge:
+            return error("Request body is too large.", 413)
+        key_digest = idempotency.digest(request.url.path, key)
+        request_hash = idempotency.fingerprint(body)
+        if not idempotency_store.claim(key_digest):
+            return in_progress()
+        try:
+            stored = idempotency_store.cached(key_digest)
+            if stored is None:
+                stored = await asyncio.to_thread(idempotency_store.lookup, key_digest)
+            if stored is not None:
+                return replay(stored, request_hash)
+            request.state.idempotency_key = (key_digest, request_hash)
+            try:
+                response = await view(request)
+            except idempotency.KeyTaken:
+                stored = await asyncio.to_thread(idempotency_store.lookup, key_digest)
+                return in_progress() if stored is None else replay(stored, request_hash)
+            if storable(request, response.status_code) and not getattr(request.state, "idempotency_saved", False):
+                await asyncio.to_thread(
+                    idempotency_store.save, key_digest, request_hash, response.status_code, response.body)
+            return response
+        finally:
+            idempotency_store.release(key_digest)
+    return wrapper
+
+
+async def insert_submission(request, table, row, message):
+    """insert_row() with the request's Idempotency-Key saved in the same transaction."""
+    key = getattr(request.state, "idempotency_key", None)
+    if key is None:
+        return await insert_row(table, row)
+    # Stored without recent_entries: a replay omits them.
+    stored_body = FormJSONResponse({"status": "success", "message": message}).body
+    row_id = await insert_row(table, row, (*key, 200, stored_body))
+    if row_id is not None:
+        if idempotency_store.remember(*key, 200, stored_body):
+            await asyncio.to_thread(idempotency_store.purge)
+        request.state.idempotency_saved = True
+    return row_id
+
+
+async def submitted(request, table, row_id, row, message):
+    record_submission(table, row_id, row)
+    response = {"status": "success", "message": message}
+    if wants_recent_entries(request):
+        recent = recent_entries[table]
+        # A due re-read of the table runs in a worker thread, not on the event loop.
+        response["recent_entries"] = await asyncio.to_thread(recent.snapshot) if recent.stale() else recent.snapshot()
+    return FormJSONResponse(response)
+
+
+# --- Routes ---
+@idempotent
+async def contact(request):
+    try:
+        data = await read_json(request)
+        row = parse_contact(data)
+    except FormError as e:
+        return invalid(request, e)
+    except BodyTooLarge:
+        return error("Request body is too large.", 413)
+
+    rejected = await spam_check(request, CONTACT_TABLE, data, row)
+    if rejected:
+        return rejected
+
+    if is_known_duplicate(CONTACT_TABLE, row):
+        return duplicate()
+    message = "✅ Message submitted successfully."
+    try:
+        row_id = await insert_submission(request, CONTACT_TABLE, row, message)
+    except idempotency.KeyTaken:
+        raise  # answered by idempotent()
+    except (aiomysql.Error, mysql.connector.Error) as e:
+        print("❌ Database Error:", e)
+        return error("Database connection or query failed.", 500)
+    except Exception as e:
+        print("❌ Unexpected Error:", e)
+        return error("Server error. Please try again later.", 500)
+    if row_id is None:
+        remember_content(CONTACT_TABLE, row)
+        return duplicate()
+    return await submitted(request, CONTACT_TABLE, row_id, row, message)
+
+
+@idempotent
+async def request_service(request):
+    try:
+        data = await read_json(request)
+        row = parse_service_request(data)
+    except FormError as e:
+        return invalid(request, e)
+    except BodyTooLarge:
+        return error("Request body is too large.", 413)
+
+    rejected = await spam_check(request, SERVICE_TABLE, data, row)
+    if rejected:
+        return rejected
+
+    message = "✅ Service request submitted successfully."
+    try:
+        row_id = await insert_submission(request, SERVICE_TABLE, row, message)
+    except idempotency.KeyTaken:
+        raise  # answered by idempotent()
+    except (aiomysql.Error, mysql.connector.Error) as e:
+        print("❌ Database Error:", e)
+        return error("Database connection or query failed.", 500)
+    except Exception as e:
+        print("❌ Unexpected Error:", e)
+        return error("Server error. Please try again later.", 500)
+    return await submitted(request, SERVICE_TABLE, row_id, row, message)
+
+
+app = Starlette(
+    routes=[
+        Route("/contact", contact, methods=["POST"]),
+        Route("/request-service", request_service, methods=["POST"]),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=list(CORS_ORIGINS), allow_methods=["*"], allow_headers=["*"]),
+    ] if CORS_ORIGINS else [],
+    lifespan=lifespan,
+)
@@ -0,0 +1,86 @@
+# /backend/bulk.py
+#
+# Bulk service-request imports for partners: parse an NDJSON stream or a JSON
+# array, validate every item with the /request-service rules, and insert the
+# valid ones in batched transactions. Results are reported per item, in
+# input order.
+
+import json
+
+from .forms import FormError, SERVICE_COLUMNS, is_spam, parse_service_request
+
+
+class BulkError(Exception):
+    """The request as a whole is unusable (bad body, too many items)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_items(body, content_type, max_items):
+    """Request body -> list of decoded items; an undecodable NDJSON line becomes a FormError item."""
+    text = body.decode("utf-8", errors="replace")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(FormError("Invalid JSON."))
+    else:
+        try:
+            items = json.loads(text)
+        except ValueError:
+            raise BulkError("Invalid request body.")
+        if not isinstance(items, list):
+            raise BulkError("Expected a JSON array or NDJSON (application/x-ndjson).")
+    if not items:
+        raise BulkError("No items submitted.")
+    if len(items) > max_items:
+        raise BulkError(f"Too many items ({len(items)}); the limit is {max_items} per request.", 413)
+    return items
+
+
+def validate(items):
+    """Split into (rows [(index, row)], results {index: error result})."""
+    rows, results = [], {}
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, FormError):
+                raise item
+            if isinstance(item, dict) and is_spam(item):
+                raise FormError("Spam detected.")
+            rows.append((index, parse_service_request(item)))
+        except FormError as e:
+            results[index] = {"index": index, "status": "error", "message": e.message}
+    return rows, results
+
+
+def insert_batches(get_connection, table, rows, batch_size, enqueue=None):
+    """executemany INSERT per batch; yields (batch, error or None) after each commit/rollback.
+
+    `enqueue(cursor, table, rows)` runs in each batch's transaction (notification outbox).
+    """
+    columns = ", ".join(SERVICE_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(SERVICE_COLUMNS))
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+    with get_connection() as conn:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(sql, [tuple(row.values()) for _, row in batch])
+                if enqueue is not None:
+                    enqueue(cursor, table, [row for _, row in batch])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                yield batch, e
+            else:
+                yield batch, None
+            finally:
+                cursor.close()
@@ -0,0 +1,142 @@
+# /backend/config.py
+
+import os
+
+# --- Environment Variables ---
+DB_HOST = os.environ.get("DB_HOST", "localhost")
+DB_USER = os.environ.get("DB_USER", "root")
+DB_PASS = os.environ.get("DB_PASS", "")
+DB_NAME = os.environ.get("DB_NAME", "mini_browser")
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 5))      # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))     # max connection age in seconds
+
+# --- Storage ---
+# "mysql" (DB_* above) or "sqlite": one embedded database file in WAL mode, no
+# server needed (single node / CI); inserts go through one batching writer thread.
+STORAGE = os.environ.get("STORAGE", "mysql")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "forms.sqlite3")
+SQLITE_WRITE_BATCH = int(os.environ.get("SQLITE_WRITE_BATCH", 256))     # max rows per writer transaction
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "FULL")      # FULL | NORMAL (survives app crashes, not power loss)
+
+# --- Web Server (backend/serve.py, gunicorn) ---
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", 0))                 # 0 = 2 x CPUs + 1
+WEB_THREADS = int(os.environ.get("WEB_THREADS", 4))                 # threads per worker
+WEB_TIMEOUT = int(os.environ.get("WEB_TIMEOUT", 30))                # seconds before a stuck worker is restarted
+WEB_GRACEFUL_TIMEOUT = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))  # seconds to drain on shutdown
+
+# Run pending schema migrations at startup instead of only checking the version.
+MIGRATE_ON_START = os.environ.get("MIGRATE_ON_START", "0") == "1"
+
+# --- Endpoints ---
+# Comma-separated subset of "contact,request-service" mounted by create_app() by default.
+ENDPOINTS = tuple(e.strip() for e in os.environ.get("ENDPOINTS", "contact,request-service").split(",") if e.strip())
+
+# --- Pages & CORS ---
+# index.html / reqservice.html are served from memory by the app (same origin, so no
+# CORS preflight per submit). The endpoint URLs are written into the pages' <meta> tags.
+SERVE_PAGES = os.environ.get("SERVE_PAGES", "1") == "1"
+STATIC_DIR = os.environ.get("STATIC_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONTACT_URL = os.environ.get("CONTACT_URL", "/contact")
+SERVICE_URL = os.environ.get("SERVICE_URL", "/request-service")
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", 0))   # seconds; 0 = revalidate with ETag every time
+# Comma-separated origins allowed to call the API cross-origin ("*" = any, empty = CORS off).
+CORS_ORIGINS = tuple(o.strip() for o in os.environ.get("CORS_ORIGINS", "*").split(",") if o.strip())
+
+# --- Request Limits ---
+# Bodies above this are refused with 413 before they are read or parsed.
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", 256 * 1024))
+BULK_MAX_BYTES = int(os.environ.get("BULK_MAX_BYTES", 8 * 1024 * 1024))   # /request-service/bulk
+
+# --- Responses ---
+# Recent entries are only added to responses on request (?recent=1) or when this is set to 1.
+INCLUDE_RECENT_ENTRIES = os.environ.get("INCLUDE_RECENT_ENTRIES", "0") == "1"
+# Seconds between re-reads of the newest rows, so every worker / node shows the same "last N"
+# (0 = this process's own inserts only; right for a single process).
+RECENT_ENTRIES_REFRESH = float(os.environ.get("RECENT_ENTRIES_REFRESH", 1.0))
+
+# --- Write-Behind Ingestion ---
+# When enabled, submissions are journaled locally, acknowledged at once and
+# inserted into MySQL in batches by a background thread.
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_JOURNAL = os.environ.get("WRITE_BEHIND_JOURNAL", "write_behind.journal")
+WRITE_BEHIND_MAX_DEPTH = int(os.environ.get("WRITE_BEHIND_MAX_DEPTH", 10000))   # queued rows before 503s
+WRITE_BEHIND_BATCH = int(os.environ.get("WRITE_BEHIND_BATCH", 500))             # rows per multi-row INSERT
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", 0.5))     # max seconds between flushes
+
+# --- Spam Protection ---
+EMAIL_COOLDOWN = 60  # seconds
+IP_LIMIT = 5         # max submissions per IP per minute
+# Blocked networks (one CIDR or address per line) and extra disposable email domains; empty = none.
+IP_BLOCKLIST_PATH = os.environ.get("IP_BLOCKLIST_PATH", "")
+DISPOSABLE_DOMAINS_PATH = os.environ.get("DISPOSABLE_DOMAINS_PATH", "")
+SPAM_MAX_LINKS = int(os.environ.get("SPAM_MAX_LINKS", 3))   # links allowed across a submission's text fields
+DEDUPE_CACHE_SIZE = int(os.environ.get("DEDUPE_CACHE_SIZE", 100000))  # recent message hashes kept in memory
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", 86400))            # seconds a stored response is replayed
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 10000))  # keys kept in memory (all persist in MySQL)
+EMAIL_INDEX_SIZE = int(os.environ.get("EMAIL_INDEX_SIZE", 100000))  # max addresses kept in the cooldown index
+# Set to 1 only when a single process writes the tables: index misses then skip the DB lookup.
+EMAIL_INDEX_AUTHORITATIVE = os.environ.get("EMAIL_INDEX_AUTHORITATIVE", "0") == "1"
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")    # memory | sqlite | redis (IP limit + partner quota)
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 100000))  # max tracked IPs (memory backend)
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "/tmp/rate_limit.sqlite3")
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+
+# --- Email Domain (MX) Cache ---
+MX_CACHE_SIZE = int(os.environ.get("MX_CACHE_SIZE", 10000))    # max cached domains
+MX_TIMEOUT = float(os.environ.get("MX_TIMEOUT", 2))             # resolver timeout in seconds
+MX_NEGATIVE_TTL = int(os.environ.get("MX_NEGATIVE_TTL", 300))   # seconds to remember domains without MX
+
+# --- Retention ---
+# Rows older than RETENTION_DAYS are moved to gzip NDJSON files under ARCHIVE_DIR (0 = keep forever).
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 0))
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+ARCHIVE_BATCH = int(os.environ.get("ARCHIVE_BATCH", 1000))          # rows moved per transaction
+ARCHIVE_INTERVAL = int(os.environ.get("ARCHIVE_INTERVAL", 3600))    # seconds between passes
+
+# --- Notifications ---
+# New submissions are written to notification_outbox in the insert transaction
+# and delivered by background workers; no channel configured = no outbox rows.
+NOTIFY_WEBHOOK_URL = os.environ.get("NOTIFY_WEBHOOK_URL", "")
+NOTIFY_WEBHOOK_SECRET = os.environ.get("NOTIFY_WEBHOOK_SECRET", "")   # HMAC-SHA256 X-Signature when set
+NOTIFY_SMTP_HOST = os.environ.get("NOTIFY_SMTP_HOST", "")
+NOTIFY_SMTP_PORT = int(os.environ.get("NOTIFY_SMTP_PORT", 587))
+NOTIFY_SMTP_USER = os.environ.get("NOTIFY_SMTP_USER", "")
+NOTIFY_SMTP_PASS = os.environ.get("NOTIFY_SMTP_PASS", "")
+NOTIFY_SMTP_STARTTLS = os.environ.get("NOTIFY_SMTP_STARTTLS", "1") == "1"
+NOTIFY_FROM = os.environ.get("NOTIFY_FROM", "noreply@localhost")
+NOTIFY_TO = tuple(a.strip() for a in os.environ.get("NOTIFY_TO", "").split(",") if a.strip())
+NOTIFY_WORKERS = int(os.environ.get("NOTIFY_WORKERS", 2))
+NOTIFY_BATCH = int(os.environ.get("NOTIFY_BATCH", 50))                # notifications per delivery
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", 8))   # then the row is marked dead
+NOTIFY_RETRY_BASE = float(os.environ.get("NOTIFY_RETRY_BASE", 5))     # seconds, doubled per attempt
+NOTIFY_RETRY_MAX = float(os.environ.get("NOTIFY_RETRY_MAX", 3600))
+NOTIFY_POLL_INTERVAL = float(os.environ.get("NOTIFY_POLL_INTERVAL", 2))
+NOTIFY_TIMEOUT = float(os.environ.get("NOTIFY_TIMEOUT", 10))          # per webhook / SMTP call
+
+# --- Metrics ---
+# Stage histograms and outcome counters for GET /metrics (Prometheus text format).
+METRICS = os.environ.get("METRICS", "1") == "1"
+# Per-worker snapshots summed by /metrics under gunicorn; empty = a fresh temp dir per server run.
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+
+# --- Partner Bulk Imports ---
+# "name:key,name:key" — API keys accepted by POST /request-service/bulk.
+PARTNER_KEYS = {
+    key.strip(): name.strip()
+    for name, _, key in (pair.partition(":") for pair in os.environ.get("PARTNER_KEYS", "").split(","))
+    if key.strip()
+}
+PARTNER_QUOTA = int(os.environ.get("PARTNER_QUOTA", 10000))     # items per partner per hour
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 5000))     # items per request
+BULK_BATCH = int(os.environ.get("BULK_BATCH", 500))             # rows per INSERT transaction
+
+# --- Admin ---
+# Bearer token for /admin/* endpoints; when empty, the admin API is disabled.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+EXPORT_BATCH = int(os.environ.get("EXPORT_BATCH", 1000))   # rows per keyset-paginated export query
+
+# --- ASGI ---
+ASYNC_POOL_MIN = int(os.environ.get("ASYNC_POOL_MIN", 1))
+ASYNC_POOL_MAX = int(os.environ.get("ASYNC_POOL_MAX", 50))
@@ -0,0 +1,317 @@
+# /backend/core.py
+#
+# Process-wide shared state: one storage engine (MySQL pool or SQLite), one
+# limiter, one MX cache, one cooldown index and recent-entries buffer per
+# table, one write-behind queue. Every endpoint mounted by create_app() (and the ASGI app) uses these.
+
+import atexit
+import time
+
+import mysql.connector
+
+from .config import (
+    DB_HOST, DB_USER, DB_PASS, DB_NAME, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    STORAGE, SQLITE_PATH, SQLITE_WRITE_BATCH, SQLITE_SYNCHRONOUS,
+    WRITE_BEHIND, WRITE_BEHIND_JOURNAL, WRITE_BEHIND_MAX_DEPTH, WRITE_BEHIND_BATCH, WRITE_BEHIND_INTERVAL,
+    EMAIL_COOLDOWN, IP_LIMIT, IP_BLOCKLIST_PATH, DISPOSABLE_DOMAINS_PATH, SPAM_MAX_LINKS, PARTNER_QUOTA, DEDUPE_CACHE_SIZE, IDEMPOTENCY_TTL, IDEMPOTENCY_CACHE_SIZE, EMAIL_INDEX_SIZE, EMAIL_INDEX_AUTHORITATIVE,
+    RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_SQLITE_PATH, RATE_LIMIT_REDIS_URL,
+    MX_CACHE_SIZE, MX_TIMEOUT, MX_NEGATIVE_TTL, METRICS, RECENT_ENTRIES_REFRESH,
+    RETENTION_DAYS, ARCHIVE_DIR, ARCHIVE_BATCH, ARCHIVE_INTERVAL,
+    NOTIFY_WEBHOOK_URL, NOTIFY_WEBHOOK_SECRET, NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, NOTIFY_SMTP_USER, NOTIFY_SMTP_PASS,
+    NOTIFY_SMTP_STARTTLS, NOTIFY_FROM, NOTIFY_TO, NOTIFY_WORKERS, NOTIFY_BATCH, NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_RETRY_BASE, NOTIFY_RETRY_MAX, NOTIFY_POLL_INTERVAL, NOTIFY_TIMEOUT,
+)
+from . import metrics, migrations, timing
+from .db_pool import ConnectionPool
+from .dedupe import RecentHashes
+from .email_cooldown import EmailCooldown
+from .forms import CONTACT_COLUMNS, SERVICE_COLUMNS
+from .idempotency import IdempotencyStore
+from .mx_cache import MXCache
+from .notifications import Dispatcher, SMTPSender, WebhookSender
+from .rate_limiter import make_limiter, make_quota
+from .recent_entries import RecentEntries
+from .retention import Archiver
+from .spam_filter import DISPOSABLE_DOMAINS, DomainSet, IPBlocklist, Submission, build_filter
+from .storage import make_storage
+from .write_behind import WriteBehindQueue
+
+CONTACT_TABLE = "contact_messages"
+SERVICE_TABLE = "service_requests"
+
+# --- Database Connection (the pool is only used with STORAGE=mysql) ---
+db_pool = ConnectionPool(
+    lambda: mysql.connector.connect(
+        host=DB_HOST,
+        user=DB_USER,
+        password=DB_PASS,
+        database=DB_NAME
+    ),
+    min_size=DB_POOL_MIN,
+    max_size=DB_POOL_MAX,
+    timeout=DB_POOL_TIMEOUT,
+    recycle=DB_POOL_RECYCLE,
+)
+
+storage = make_storage(
+    STORAGE, db_pool,
+    sqlite_path=SQLITE_PATH, batch_size=SQLITE_WRITE_BATCH, synchronous=SQLITE_SYNCHRONOUS,
+)
+
+def get_db_connection():
+    """Check out a connection from the storage engine; conn.close() returns it."""
+    return storage.connection()
+
+# --- Spam Protection ---
+ip_limiter = make_limiter(
+    RATE_LIMIT_BACKEND, IP_LIMIT, window=60,
+    max_keys=RATE_LIMIT_MAX_KEYS,
+    sqlite_path=RATE_LIMIT_SQLITE_PATH,
+    redis_url=RATE_LIMIT_REDIS_URL,
+)
+email_cooldowns = {
+    table: EmailCooldown(
+        table, storage,
+        cooldown=EMAIL_COOLDOWN, maxsize=EMAIL_INDEX_SIZE, authoritative=EMAIL_INDEX_AUTHORITATIVE,
+    )
+    for table in (CONTACT_TABLE, SERVICE_TABLE)
+}
+partner_quota = make_quota(  # bulk imports: items per partner per hour, shared like the IP limiter
+    RATE_LIMIT_BACKEND, PARTNER_QUOTA, window=3600,
+    sqlite_path=RATE_LIMIT_SQLITE_PATH,
+    redis_url=RATE_LIMIT_REDIS_URL,
+)
+mx_cache = MXCache(maxsize=MX_CACHE_SIZE, timeout=MX_TIMEOUT, negative_ttl=MX_NEGATIVE_TTL)
+
+# --- Spam Filter (cheap checks first; see spam_filter.py) ---
+def _load(lookup, path, label):
+    if path:
+        try:
+            lookup.load(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {label} Error:", e)
+    return lookup
+
+SPAM_TEXT_FIELDS = {
+    CONTACT_TABLE: ("name", "message"),
+    SERVICE_TABLE: ("name", "sub_details", "details", "notes"),
+}
+ip_blocklist = _load(IPBlocklist(), IP_BLOCKLIST_PATH, "IP Blocklist")
+disposable_domains = _load(DomainSet(DISPOSABLE_DOMAINS), DISPOSABLE_DOMAINS_PATH, "Disposable Domains")
+
+# --- Duplicate Detection (content_hash; answered from memory for recent rows) ---
+recent_hashes = {CONTACT_TABLE: RecentHashes(CONTACT_TABLE, maxsize=DEDUPE_CACHE_SIZE)}
+
+# --- Idempotency-Key (stored first responses, replayed to retries) ---
+idempotency = IdempotencyStore(get_db_connection, maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL)
+
+# --- Recent Entries (write-through, no SELECT on the submit path) ---
+recent_entries = {
+    CONTACT_TABLE: RecentEntries(CONTACT_TABLE, CONTACT_COLUMNS, refresh=RECENT_ENTRIES_REFRESH),
+    SERVICE_TABLE: RecentEntries(SERVICE_TABLE, SERVICE_COLUMNS, refresh=RECENT_ENTRIES_REFRESH),
+}
+
+# --- Notifications (outbox rows written with each insert, delivered by worker threads) ---
+senders = []
+if NOTIFY_WEBHOOK_URL:
+    senders.append(WebhookSender(NOTIFY_WEBHOOK_URL, NOTIFY_WEBHOOK_SECRET, timeout=NOTIFY_TIMEOUT))
+if NOTIFY_SMTP_HOST and NOTIFY_TO:
+    senders.append(SMTPSender(
+        NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, NOTIFY_FROM, NOTIFY_TO,
+        user=NOTIFY_SMTP_USER, password=NOTIFY_SMTP_PASS, starttls=NOTIFY_SMTP_STARTTLS, timeout=NOTIFY_TIMEOUT,
+    ))
+notifier = Dispatcher(
+    get_db_connection, senders,
+    workers=NOTIFY_WORKERS, batch_size=NOTIFY_BATCH, max_attempts=NOTIFY_MAX_ATTEMPTS,
+    retry_base=NOTIFY_RETRY_BASE, retry_max=NOTIFY_RETRY_MAX, poll_interval=NOTIFY_POLL_INTERVAL,
+)
+atexit.register(notifier.stop)
+
+# --- Write-Behind Queue ---
+def _write_behind_enqueue(cursor, table, rows, ids):
+    if table in recent_entries:  # not for idempotency key rows queued with a submission
+        notifier.enqueue(cursor, table, rows, ids)
+
+def _write_behind_committed(table, rows, ids):
+    """Flusher callback: the queued rows now have ids and are visible to readers."""
+    if table not in recent_entries:
+        return
+    for row_id, row in zip(ids, rows):
+        recent_entries[table].append(row_id, row)
+    notifier.wake()  # their outbox rows were committed with them
+
+write_behind = WriteBehindQueue(
+    get_db_connection, WRITE_BEHIND_JOURNAL,
+    max_depth=WRITE_BEHIND_MAX_DEPTH, batch_size=WRITE_BEHIND_BATCH, flush_interval=WRITE_BEHIND_INTERVAL,
+    enqueue=_write_behind_enqueue, on_commit=_write_behind_committed,
+)
+if WRITE_BEHIND:
+    atexit.register(write_behind.stop)  # drain the queue on shutdown
+
+# --- Retention ---
+def forget_content(table, row):
+    """Archived rows may be submitted again: drop their hash from the duplicate filter."""
+    if row.get("content_hash") is not None and table in recent_hashes:
+        recent_hashes[table].discard(bytes(row["content_hash"]))
+
+archiver = Archiver(
+    get_db_connection,
+    {
+        CONTACT_TABLE: ("id",) + CONTACT_COLUMNS + ("created_at", "content_hash"),
+        SERVICE_TABLE: ("id",) + SERVICE_COLUMNS + ("created_at",),
+    },
+    RETENTION_DAYS, ARCHIVE_DIR,
+    batch_size=ARCHIVE_BATCH, interval=ARCHIVE_INTERVAL,
+    lock_name=f"{DB_NAME}.retention", forget=forget_content,
+)
+
+# --- Metrics (gauges are read from the components' stats() at scrape time) ---
+if METRICS:
+    timing.add_observer(metrics.observe_stage)
+
+def _pool_connections():
+    pool = db_pool.stats()
+    return {("idle",): pool["idle"], ("in_use",): pool["in_use"]}
+
+def _mx_lookups():
+    mx = mx_cache.stats()
+    return {(result,): mx[result] for result in ("hits", "misses", "coalesced", "errors")}
+
+metrics.Gauge("db_pool_connections", "Pooled connections by state.", _pool_connections, ("state",))
+metrics.Gauge("db_pool_max_connections", "Pool size limit.", lambda: {(): db_pool.max_size})
+metrics.CollectedCounter("db_pool_waits_total", "Checkouts that had to wait.", lambda: {(): db_pool.stats()["waits"]})
+metrics.CollectedCounter(
+    "db_pool_wait_seconds_total", "Time spent waiting for a connection.",
+    lambda: {(): db_pool.stats()["wait_time_seconds"]},
+)
+metrics.CollectedCounter("db_pool_timeouts_total", "Checkouts that timed out.", lambda: {(): db_pool.stats()["timeouts"]})
+metrics.Gauge("write_behind_queue_depth", "Rows waiting to be flushed.", lambda: {(): write_behind.stats()["depth"]})
+metrics.CollectedCounter(
+    "write_behind_rejected_total", "Submissions refused with 503 (queue full).",
+    lambda: {(): write_behind.stats()["rejected"]},
+)
+metrics.CollectedCounter(
+    "write_behind_flush_failures_total", "Batches that failed to insert.",
+    lambda: {(): write_behind.stats()["failures"]},
+)
+metrics.CollectedCounter(
+    "write_behind_dead_letters_total", "Queued rows the database rejected (kept in the .dead journal).",
+    lambda: {(): write_behind.stats()["dead"]},
+)
+metrics.CollectedCounter(
+    "spam_filter_rejections_total", "Submissions rejected, by pipeline check.",
+    lambda: {
+        (table, check): count
+        for table, spam_filter in spam_filters.items() for check, count in spam_filter.rejected.items()
+    },
+    ("table", "check"),
+)
+metrics.CollectedCounter(
+    "idempotency_lookups_total", "Idempotency-Key lookups by result.",
+    lambda: {(result,): idempotency.stats()[result] for result in ("memory_hits", "db_hits", "misses")},
+    ("result",),
+)
+metrics.CollectedCounter("mx_cache_lookups_total", "MX lookups by cache result.", _mx_lookups, ("result",))
+
+# --- Helpers ---
+def cooldown_message(table):
+    noun = "message" if table == CONTACT_TABLE else "request"
+    return f"⚠️ You must wait {EMAIL_COOLDOWN} seconds before sending another {noun}."
+
+def ip_allowed(submission):
+    """Per-IP sliding window."""
+    with timing.stage("rate_limit"):
+        return ip_limiter.hit(submission.ip)
+
+def cooldown_ok(submission):
+    """Per-email cooldown (last submission time)."""
+    now = time.time()
+    with timing.stage("cooldown"):
+        last_time = email_cooldowns[submission.table].last_submission(submission.email, now)
+    return last_time is None or now - last_time >= EMAIL_COOLDOWN
+
+def has_mx(submission):
+    with timing.stage("dns"):
+        return mx_cache.has_mx(submission.domain)
+
+# Contact submissions are also checked for MX; service requests never were.
+spam_filters = {
+    table: build_filter(
+        table, text_fields, ip_blocklist, disposable_domains, SPAM_MAX_LINKS,
+        ip_allowed, cooldown_ok, has_mx=has_mx if table == CONTACT_TABLE else None,
+        cooldown_message=cooldown_message(table),
+    )
+    for table, text_fields in SPAM_TEXT_FIELDS.items()
+}
+
+def check_spam(table, ip, data, row):
+    """Run `table`'s spam pipeline; None if the submission passed, else the Rejection."""
+    return spam_filters[table].run(Submission(table, ip, data, row))
+
+def is_known_duplicate(table, row):
+    """True if `row` has the content hash of a recently stored row (no DB round trip)."""
+    digest = row.get("content_hash")
+    return digest is not None and table in recent_hashes and recent_hashes[table].seen(digest)
+
+def remember_content(table, row):
+    """Add `row`'s content hash to the recent-hash filter (after an insert or a 1062)."""
+    digest = row.get("content_hash")
+    if digest is not None and table in recent_hashes:
+        recent_hashes[table].add(digest)
+
+def record_submission(table, row_id, row):
+    """Update the in-memory indexes after a row was written (or queued: row_id None)."""
+    email_cooldowns[table].record(row["email"])
+    if row_id is not None:  # queued / bulk rows reach recent_entries with their id once committed
+        recent_entries[table].append(row_id, row)
+    remember_content(table, row)
+    notifier.wake()
+
+# --- Startup ---
+def warm(start_write_behind=True):
+    """Open the minimum pool size and load the in-memory indexes from the tables."""
+    try:
+        storage.warm()
+        for cooldown in email_cooldowns.values():
+            cooldown.warm()
+        for recent in recent_entries.values():
+            recent.warm(storage)
+        for hashes in recent_hashes.values():
+            hashes.warm(get_db_connection)
+    except Exception as e:
+        print("❌ Database Pool Warm-up Error:", e)
+    if WRITE_BEHIND and start_write_behind:
+        write_behind.start()  # replay rows journaled by a previous run
+    if start_write_behind:
+        archiver.start()  # no-op unless RETENTION_DAYS is set
+        notifier.start()  # no-op unless a notification channel is configured
+
+def health():
+    """Readiness from in-memory state only (no DB round trip): (ok, problems)."""
+    problems = []
+    if migrations.last_check is False:
+        problems.append("database schema is not current")
+    if db_pool.stats()["connect_failing"]:
+        problems.append("database unreachable (last connection attempt failed)")
+    if WRITE_BEHIND:
+        queue = write_behind.stats()
+        if queue["depth"] >= queue["max_depth"]:
+            problems.append("write-behind queue is full")
+    return not problems, problems
+
+def stats():
+    """All shared-component counters, keyed by component."""
+    return {
+        "storage": storage.stats(),
+        "pool": db_pool.stats(),
+        "rate_limit": ip_limiter.stats(),
+        "partner_quota": partner_quota.stats(),
+        "mx": mx_cache.stats(),
+        "spam_filter": [spam_filter.stats() for spam_filter in spam_filters.values()],
+        "cooldown": [cooldown.stats() for cooldown in email_cooldowns.values()],
+        "dedupe": [hashes.stats() for hashes in recent_hashes.values()],
+        "idempotency": idempotency.stats(),
+        "write_behind": write_behind.stats(),
+        "retention": archiver.stats(),
+        "notifications": notifier.stats(),
+    }
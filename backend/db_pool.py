@@ -0,0 +1,240 @@
+# /backend/db_pool.py
+
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+class PooledConnection:
+    """Thin wrapper around a pooled connection.
+
+    Behaves like the underlying connection, except that close() hands the
+    connection back to the pool instead of tearing down the socket, so the
+    existing `conn = get_db_connection() ... conn.close()` code keeps working.
+    """
+
+    __slots__ = ("_pool", "_conn", "_created")
+
+    def __init__(self, pool, conn, created):
+        self._pool = pool
+        self._conn = conn
+        self._created = created
+
+    def __getattr__(self, name):
+        conn = self._conn
+        if conn is None:
+            raise AttributeError(f"connection already returned to pool ({name})")
+        return getattr(conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool._release(conn, self._created)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe connection pool.
+
+    `connect` is any zero-argument callable returning a DB-API connection
+    (e.g. a `mysql.connector.connect` partial). Connections are health-checked
+    on checkout and replaced when stale or older than `recycle` seconds.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0, recycle=1800, ping_after=1.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("pool size must satisfy 0 <= min_size <= max_size, max_size >= 1")
+        self.connect = connect  # zero-argument connection factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after  # skip the ping for connections idle less than this
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = deque()  # [(conn, created_at, released_at)]
+        self._size = 0        # idle + checked out
+
+        # --- Stats ---
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._connect_failures = 0
+        self._connect_failing = False  # last attempt to open a connection failed
+
+    # --- Lifecycle ---
+    def warm(self):
+        """Open connections until `min_size` are idle in the pool."""
+        while True:
+            with self._lock:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                now = time.monotonic()
+                self._idle.append((conn, now, now))
+                self._available.notify()
+
+    def reset(self):
+        """Forget all connections without closing them (use in a forked child)."""
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+
+    def close_all(self):
+        """Close every idle connection (e.g. at shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    # --- Checkout / release ---
+    def acquire(self, timeout=None):
+        """Check out a healthy connection, waiting up to `timeout` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None
+
+        while True:
+            conn = created = released = None
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + timeout
+                        self._waits += 1
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"no database connection available after {timeout}s")
+                    started = now
+                    self._available.wait(remaining)
+                    self._wait_time += time.monotonic() - started
+
+                if self._idle:
+                    conn, created, released = self._idle.pop()  # LIFO keeps hot connections hot
+                else:
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    conn = self._new_connection()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+                created = time.monotonic()
+            elif not self._healthy(conn, created, released):
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._in_use += 1
+                self._checkouts += 1
+            return PooledConnection(self, conn, created)
+
+    def _release(self, conn, created):
+        try:
+            # End the implicit transaction so the next user does not see a stale snapshot.
+            conn.rollback()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            self._discard(conn)
+            return
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append((conn, created, time.monotonic()))
+            self._available.notify()
+
+    # --- Helpers ---
+    def _new_connection(self):
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._lock:
+                self._connect_failures += 1
+                self._connect_failing = True
+            raise
+        with self._lock:
+            self._created += 1
+            self._connect_failing = False
+        return conn
+
+    def _healthy(self, conn, created, released):
+        now = time.monotonic()
+        if self.recycle and now - created > self.recycle:
+            return False
+        if now - released < self.ping_after:
+            return True
+        ping = getattr(conn, "ping", None)
+        if ping is None:
+            return True
+        try:
+            # mysql.connector: reconnects in place when the server dropped us.
+            ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except TypeError:
+            try:
+                ping()
+                return True
+            except Exception:
+                return False
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._lock:
+            self._size -= 1
+            self._discarded += 1
+            self._available.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Snapshot of pool counters for monitoring."""
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_seconds": round(self._wait_time, 6),
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "connect_failures": self._connect_failures,
+                "connect_failing": self._connect_failing,
+            }
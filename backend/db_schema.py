@@ -0,0 +1,184 @@
+# /backend/db_schema.py
+#
+# Table definitions and idempotent DDL helpers used by the migrations in
+# migrations.py. Index and column changes run as online ALTERs
+# (ALGORITHM=INPLACE, LOCK=NONE): reads and writes continue while they build,
+# and MySQL refuses the statement rather than silently locking the table.
+
+ONLINE = "ALGORITHM=INPLACE, LOCK=NONE"
+
+CONTACT_MESSAGES = """
+    CREATE TABLE IF NOT EXISTS contact_messages (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY unique_email_message (email, message(255))
+    )
+"""
+
+SERVICE_REQUESTS = """
+    CREATE TABLE IF NOT EXISTS service_requests (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        phone VARCHAR(20),
+        service VARCHAR(50) NOT NULL,
+        sub_details TEXT,
+        details TEXT,
+        priority INT NOT NULL DEFAULT 3,  -- 1 to 5
+        budget INT DEFAULT NULL,
+        platform VARCHAR(50),
+        attachment_link TEXT,
+        notes TEXT,
+        deadline DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+NOTIFICATION_OUTBOX = """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        channel VARCHAR(16) NOT NULL,             -- webhook | smtp
+        source_table VARCHAR(64) NOT NULL,
+        source_id INT NULL,                       -- NULL for batched (write-behind, bulk) inserts
+        payload MEDIUMTEXT NOT NULL,              -- JSON event
+        status VARCHAR(8) NOT NULL DEFAULT 'pending',   -- pending | dead (delivered rows are deleted)
+        attempts INT NOT NULL DEFAULT 0,
+        next_attempt_at DATETIME NULL,            -- NULL: due now
+        claim_token CHAR(32) NULL,
+        claimed_until DATETIME NULL,
+        last_error VARCHAR(255) NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_due (status, next_attempt_at),
+        KEY idx_claim (claim_token)
+    )
+"""
+
+# Stored first responses for Idempotency-Key retries (see idempotency.py).
+IDEMPOTENCY_KEYS = """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        key_hash BINARY(16) PRIMARY KEY,          -- blake2b(endpoint path, key)
+        request_hash BINARY(16) NOT NULL,         -- blake2b(request body)
+        status SMALLINT NOT NULL,
+        response MEDIUMBLOB NOT NULL,             -- JSON body as sent
+        expires_at DATETIME NOT NULL,
+        KEY idx_expires (expires_at)
+    )
+"""
+
+# Dashboard filters / sorts on service_requests (see service_query.py).
+# InnoDB secondary indexes carry the primary key, so id-only subqueries are index-only.
+SERVICE_INDEXES = {
+    "idx_created": ("created_at",),
+    "idx_service_created": ("service", "created_at"),
+    "idx_service_priority_created": ("service", "priority", "created_at"),
+    "idx_service_deadline": ("service", "deadline"),
+    "idx_service_budget": ("service", "budget"),
+    "idx_priority_created": ("priority", "created_at"),
+    "idx_deadline": ("deadline",),
+    "idx_budget": ("budget",),
+}
+
+# Embedded SQLite storage (storage.py): the current schema in one script, run on every open.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL COLLATE NOCASE,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    content_hash BLOB
+);
+CREATE TABLE IF NOT EXISTS service_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL COLLATE NOCASE,
+    phone TEXT,
+    service TEXT NOT NULL,
+    sub_details TEXT,
+    details TEXT,
+    priority INTEGER NOT NULL DEFAULT 3,
+    budget INTEGER DEFAULT NULL,
+    platform TEXT,
+    attachment_link TEXT,
+    notes TEXT,
+    deadline DATE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    source_table TEXT NOT NULL,
+    source_id INTEGER,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP,
+    claim_token TEXT,
+    claimed_until TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key_hash BLOB PRIMARY KEY,
+    request_hash BLOB NOT NULL,
+    status INTEGER NOT NULL,
+    response BLOB NOT NULL,
+    expires_at TIMESTAMP NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS contact_uniq_content_hash ON contact_messages (content_hash);
+CREATE INDEX IF NOT EXISTS contact_idx_email_created ON contact_messages (email, created_at);
+CREATE INDEX IF NOT EXISTS contact_idx_created ON contact_messages (created_at);
+CREATE INDEX IF NOT EXISTS service_idx_email_created ON service_requests (email, created_at);
+CREATE INDEX IF NOT EXISTS outbox_idx_due ON notification_outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_idx_claim ON notification_outbox (claim_token);
+CREATE INDEX IF NOT EXISTS idempotency_idx_expires ON idempotency_keys (expires_at);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON service_requests ({', '.join(columns)});\n"
+    for name, columns in SERVICE_INDEXES.items()
+)
+
+
+def ensure_column(cursor, database, table, name, definition):
+    """Add column `name` to `table` (online) unless it already exists."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (database, table, name))
+    if cursor.fetchone():
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}, {ONLINE}")
+    print(f"🔧 Added column '{name}' to {table}.")
+    return True
+
+
+def ensure_index(cursor, database, table, name, columns, unique=False):
+    """Create index `name` on `table` (online) unless it already exists (MySQL has no IF NOT EXISTS)."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = %s AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (database, table, name))
+    if cursor.fetchone():
+        return False
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)}), {ONLINE}")
+    print(f"🔧 Added index '{name}' on {table} ({', '.join(columns)}).")
+    return True
+
+
+def drop_index(cursor, database, table, name):
+    """Drop index `name` from `table` (online) if it exists."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = %s AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (database, table, name))
+    if not cursor.fetchone():
+        return False
+    cursor.execute(f"ALTER TABLE {table} DROP INDEX {name}, {ONLINE}")
+    print(f"🔧 Dropped index '{name}' from {table}.")
+    return True
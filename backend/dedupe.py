@@ -0,0 +1,75 @@
+# /backend/dedupe.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(email, message):
+    """16-byte digest of the normalized email and the full message (contact_messages.content_hash)."""
+    data = email.strip().lower().encode("utf-8") + b"\0" + message.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class RecentHashes:
+    """LRU set of the content hashes of recently stored rows.
+
+    Exact (no false positives), so a hit can be answered as a duplicate
+    without asking MySQL; a miss still goes to the unique index.
+    """
+
+    def __init__(self, table, maxsize=100000):
+        self.table = table
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._hashes = OrderedDict()  # {digest: None}, oldest first
+
+        # --- Stats ---
+        self.hits = 0
+        self.misses = 0
+
+    def seen(self, digest):
+        with self._lock:
+            if digest in self._hashes:
+                self._hashes.move_to_end(digest)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, digest):
+        with self._lock:
+            self._hashes[digest] = None
+            self._hashes.move_to_end(digest)
+            while len(self._hashes) > self.maxsize:
+                self._hashes.popitem(last=False)
+
+    def discard(self, digest):
+        with self._lock:
+            self._hashes.pop(digest, None)
+
+    def warm(self, get_connection):
+        """Load the hashes of the newest `maxsize` rows."""
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT content_hash FROM {self.table} WHERE content_hash IS NOT NULL ORDER BY id DESC LIMIT %s",
+                (self.maxsize,),
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        with self._lock:
+            self._hashes.clear()
+            for (digest,) in reversed(rows):
+                self._hashes[bytes(digest)] = None
+        return len(rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "table": self.table,
+                "size": len(self._hashes),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,132 @@
+# /backend/email_cooldown.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def email_key(email):
+    """Fixed-width key for an address (MySQL compares emails case-insensitively)."""
+    return hashlib.blake2b(email.strip().lower().encode("utf-8"), digest_size=16).digest()
+
+
+class EmailCooldown:
+    """In-memory index of the last submission time per email for one table.
+
+    Entries expire after `cooldown` seconds and the index holds at most
+    `maxsize` addresses. On a miss the table is consulted through the
+    (email, created_at) index (storage.last_submission), unless `authoritative` is set — then the index,
+    warmed at startup and updated on every insert, is trusted on its own
+    (only safe when a single process writes to the table).
+    """
+
+    def __init__(self, table, storage, cooldown=60, maxsize=100000, authoritative=False):
+        self.table = table
+        self.storage = storage
+        self.cooldown = cooldown
+        self.maxsize = maxsize
+        self.authoritative = authoritative
+        self._lock = threading.Lock()
+        self._last_seen = OrderedDict()  # {email_key: epoch seconds}, oldest first
+
+        # --- Stats ---
+        self.hits = 0
+        self.misses = 0
+        self.db_lookups = 0
+
+    def last_submission(self, email, now=None):
+        """Epoch time of the last submission from `email` within the cooldown, else None."""
+        now = time.time() if now is None else now
+        found, last = self._cached(email, now)
+        if found:
+            return last
+        return self._from_db(email, self.storage.last_submission(self.table, email), now)
+
+    async def last_submission_async(self, email, fetch_last, now=None):
+        """Asyncio variant: `fetch_last(table, email)` is a coroutine returning MAX(created_at)."""
+        now = time.time() if now is None else now
+        found, last = self._cached(email, now)
+        if found:
+            return last
+        return self._from_db(email, await fetch_last(self.table, email), now)
+
+    def _cached(self, email, now):
+        """(True, answer) when the index alone decides, else (False, None)."""
+        key = email_key(email)
+        with self._lock:
+            self._expire(now)
+            last = self._last_seen.get(key)
+            if last is not None and now - last < self.cooldown:
+                self.hits += 1
+                return True, last
+            self.misses += 1
+            if self.authoritative:
+                return True, None
+            self.db_lookups += 1
+            return False, None
+
+    def _from_db(self, email, last_at, now):
+        if last_at is None:
+            return None
+        last = last_at.timestamp()
+        if now - last >= self.cooldown:
+            return None
+        self.record(email, last)
+        return last
+
+    def record(self, email, ts=None):
+        """Remember a successful submission from `email` at `ts` (default: now)."""
+        self._store(email_key(email), time.time() if ts is None else ts)
+
+    def warm(self):
+        """Load every address that is still inside its cooldown from the table."""
+        since = datetime.now() - timedelta(seconds=self.cooldown)
+        rows = self.storage.last_submissions(self.table, since)
+        for row in rows:
+            self._store(email_key(row["email"]), row["last_at"].timestamp())
+        return len(rows)
+
+    def _store(self, key, ts):
+        with self._lock:
+            old = self._last_seen.get(key)
+            if old is not None and old >= ts:
+                return
+            last_seen = self._last_seen
+            last_seen.pop(key, None)
+            # Keep time order for _expire: a DB-loaded timestamp can be older than
+            # the newest entries, so set those aside and re-append them after it.
+            newer = []
+            while last_seen:
+                tail_key, tail_ts = last_seen.popitem(last=True)
+                if tail_ts <= ts:
+                    last_seen[tail_key] = tail_ts
+                    break
+                newer.append((tail_key, tail_ts))
+            last_seen[key] = ts
+            for newer_key, newer_ts in reversed(newer):
+                last_seen[newer_key] = newer_ts
+            while len(self._last_seen) > self.maxsize:
+                self._last_seen.popitem(last=False)
+
+    def _expire(self, now):
+        # Entries are kept in time order, so expired ones sit at the front.
+        cutoff = now - self.cooldown
+        last_seen = self._last_seen
+        while last_seen:
+            key, ts = next(iter(last_seen.items()))
+            if ts > cutoff:
+                break
+            del last_seen[key]
+
+    def stats(self):
+        """Snapshot of index counters for monitoring."""
+        with self._lock:
+            return {
+                "table": self.table,
+                "size": len(self._last_seen),
+                "hits": self.hits,
+                "misses": self.misses,
+                "db_lookups": self.db_lookups,
+            }
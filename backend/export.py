@@ -0,0 +1,109 @@
+# /backend/export.py
+#
+# Streaming table export. Rows are read in keyset-paginated batches
+# (WHERE id > last_id ORDER BY id LIMIT n) and formatted one at a time, so
+# memory stays at one batch whatever the table size, and the first bytes go
+# out as soon as the first batch is read. A connection is held only while a
+# batch is fetched (storage.select), never while the client is reading.
+
+import csv
+import io
+import json
+from datetime import date, datetime, time
+
+from .core import CONTACT_TABLE, SERVICE_TABLE
+from .forms import CONTACT_COLUMNS, SERVICE_COLUMNS
+
+EXPORT_COLUMNS = {
+    CONTACT_TABLE: ("id",) + CONTACT_COLUMNS + ("created_at",),
+    SERVICE_TABLE: ("id",) + SERVICE_COLUMNS + ("created_at",),
+}
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class ExportError(Exception):
+    """Invalid export parameters (unknown table, bad date, ...)."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def parse_datetime(value, name):
+    """YYYY-MM-DD or ISO 8601 datetime; None for an empty value."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid {name} date: {value}")
+
+
+def build_query(table, since=None, until=None, service=None, after_id=0, limit=1000):
+    """Keyset-paginated SELECT for one batch: rows with id > after_id, in id order."""
+    if table not in EXPORT_COLUMNS:
+        raise ExportError(f"Unknown table: {table}")
+    if service and table != SERVICE_TABLE:
+        raise ExportError(f"The service filter only applies to {SERVICE_TABLE}.")
+
+    where, params = ["id > %s"], [after_id]
+    if since:
+        where.append("created_at >= %s")
+        params.append(since)
+    if until:
+        where.append("created_at < %s")
+        params.append(until)
+    if service:
+        where.append("service = %s")
+        params.append(service)
+    params.append(limit)
+    sql = (f"SELECT {', '.join(EXPORT_COLUMNS[table])} FROM {table} "
+           f"WHERE {' AND '.join(where)} ORDER BY id LIMIT %s")
+    return sql, tuple(params)
+
+
+def iter_rows(storage, table, since=None, until=None, service=None, after_id=0, batch_size=1000):
+    """Yield every matching row of `table` as a dict, `batch_size` rows per query."""
+    while True:
+        rows = storage.select(*build_query(table, since, until, service, after_id, batch_size))
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1]["id"]
+
+
+# --- Formatting ---
+def json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, default=json_default, ensure_ascii=False) + "\n"
+
+
+def to_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    yield line(columns)
+    for row in rows:
+        yield line([row.get(column) for column in columns])
+
+
+def export(storage, table, fmt="ndjson", **filters):
+    """Formatted export of `table` as an iterator of text chunks."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format: {fmt} (use csv or ndjson)")
+    build_query(table, service=filters.get("service"))  # validate before the first chunk is sent
+    rows = iter_rows(storage, table, **filters)
+    return to_csv(rows, EXPORT_COLUMNS[table]) if fmt == "csv" else to_ndjson(rows)
@@ -0,0 +1,228 @@
+# /backend/forms.py
+#
+# Declarative payload schemas for /contact and /request-service. Each field
+# knows how to coerce and bound its own value; a Schema runs the cheap
+# checks (shape, types, lengths) before anything touches DNS or MySQL and
+# returns a __slots__ record that behaves like the row dict it replaces.
+
+import re
+from datetime import date
+
+from .dedupe import content_hash
+
+EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+CONTACT_COLUMNS = ("name", "email", "message")
+SERVICE_COLUMNS = ("name", "email", "phone", "service", "sub_details", "details", "priority", "budget",
+                   "platform", "attachment_link", "notes", "deadline")
+DEFAULT_PRIORITY = 3
+
+
+class FormError(Exception):
+    """Validation failure; `message` is returned to the client with HTTP 400."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def is_spam(data):
+    """Honeypot: the hidden `website` field is only ever filled in by bots."""
+    value = data.get("website")
+    return bool(value.strip() if isinstance(value, str) else value)
+
+
+def email_format_ok(email):
+    return bool(EMAIL_RE.match(email))
+
+
+# --- Fields ---
+class Text:
+    """Stripped string; empty when missing.
+
+    `max_length` is in characters (VARCHAR columns), `max_bytes` in UTF-8
+    bytes (TEXT columns); the bytes are only counted for long values.
+    """
+
+    __slots__ = ("name", "required", "max_length", "max_bytes")
+
+    def __init__(self, name, required=False, max_length=None, max_bytes=None):
+        self.name = name
+        self.required = required
+        self.max_length = max_length
+        self.max_bytes = max_bytes
+
+    def parse(self, value):
+        if type(value) is not str:
+            if value is None:
+                return ""
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise FormError("Invalid request body.")
+            value = str(value)  # e.g. a phone number sent as a JSON number
+        value = value.strip()
+        if self.max_length is not None and len(value) > self.max_length:
+            raise FormError(f"{self.label()} is too long (max {self.max_length} characters).")
+        if self.max_bytes is not None and len(value) > self.max_bytes // 4 and len(value.encode("utf-8")) > self.max_bytes:
+            raise FormError(f"{self.label()} is too long.")
+        return value
+
+    def label(self):
+        return self.name.replace("_", " ").capitalize()
+
+
+class Integer:
+    """Optional integer; `default` when missing, FormError(`message`) when invalid or out of range."""
+
+    __slots__ = ("name", "required", "default", "low", "high", "message")
+
+    def __init__(self, name, message, default=None, low=None, high=None):
+        self.name = name
+        self.required = False
+        self.default = default
+        self.low = low
+        self.high = high
+        self.message = message
+
+    def parse(self, value):
+        if value is None or value == "":
+            return self.default  # missing (0 is a value and is range-checked)
+        if isinstance(value, bool):
+            raise FormError(self.message)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise FormError(self.message)
+        if (self.low is not None and value < self.low) or (self.high is not None and value > self.high):
+            raise FormError(self.message)
+        return value
+
+
+class Date:
+    """Optional YYYY-MM-DD date -> datetime.date."""
+
+    __slots__ = ("name", "required", "message")
+
+    def __init__(self, name, message):
+        self.name = name
+        self.required = False
+        self.message = message
+
+    def parse(self, value):
+        if value is None or value == "":
+            return None
+        match = DATE_RE.fullmatch(value.strip()) if isinstance(value, str) else None
+        if match is None:
+            raise FormError(self.message)
+        try:
+            return date(int(match[1]), int(match[2]), int(match[3]))
+        except ValueError:
+            raise FormError(self.message)
+
+
+# --- Records ---
+class Record:
+    """Row record with __slots__ fields; supports the read-only dict protocol used by the insert path."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+
+class ContactRecord(Record):
+    __slots__ = CONTACT_COLUMNS + ("content_hash",)
+
+
+class ServiceRecord(Record):
+    __slots__ = SERVICE_COLUMNS
+
+
+# --- Schemas ---
+class Schema:
+    """Ordered fields -> record. Missing required fields win over every other error."""
+
+    def __init__(self, record, fields, required_message):
+        self.record = record
+        self.fields = tuple(fields)
+        self.required_message = required_message
+
+    def parse(self, data):
+        if not isinstance(data, dict):
+            raise FormError("Invalid request body.")
+        record = self.record()
+        get = data.get
+        missing, first_error = False, None
+        for field in self.fields:
+            try:
+                value = field.parse(get(field.name))
+            except FormError as e:
+                first_error = first_error or e
+                value = None
+            else:
+                if field.required and not value:
+                    missing = True
+            setattr(record, field.name, value)
+        if missing:
+            raise FormError(self.required_message)
+        if first_error is not None:
+            raise first_error
+        return record
+
+
+CONTACT_SCHEMA = Schema(ContactRecord, (
+    Text("name", required=True, max_length=255),
+    Text("email", required=True, max_length=255),
+    Text("message", required=True, max_bytes=65535),
+), "All fields are required.")
+
+SERVICE_SCHEMA = Schema(ServiceRecord, (
+    Text("name", required=True, max_length=255),
+    Text("email", required=True, max_length=255),
+    Text("phone", max_length=20),
+    Text("service", required=True, max_length=50),
+    Text("sub_details", max_bytes=65535),
+    Text("details", max_bytes=65535),
+    Integer("priority", "Priority must be between 1 and 5.", default=DEFAULT_PRIORITY, low=1, high=5),
+    Integer("budget", "Budget must be a number."),
+    Text("platform", max_length=50),
+    Text("attachment_link", max_bytes=65535),
+    Text("notes", max_bytes=65535),
+    Date("deadline", "Deadline must be a date (YYYY-MM-DD)."),
+), "Name, email, and service are required.")
+
+
+def parse_contact(data):
+    """Validate a /contact payload; returns a ContactRecord or raises FormError."""
+    record = CONTACT_SCHEMA.parse(data)
+    record.content_hash = content_hash(record.email, record.message)  # duplicate detection key
+    return record
+
+
+def parse_service_request(data):
+    """Validate a /request-service payload; returns a ServiceRecord or raises FormError."""
+    return SERVICE_SCHEMA.parse(data)
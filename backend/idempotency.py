@@ -0,0 +1,272 @@
+# /backend/idempotency.py
+#
+# Idempotency-Key support for the form endpoints. The first final response
+# for a key (success / duplicate, or a validation error) is stored (bounded
+# in-memory LRU + the idempotency_keys table, both with a TTL); a retry with
+# the same key gets that response back without running validation, the spam
+# checks or the insert again. Keys are scoped to the endpoint path and
+# stored as a 16-byte hash.
+#
+# For a success the key row is written in the submission's own INSERT
+# transaction (writer()), so a keyed submit costs no extra write: when two
+# workers race on one key, the second one's key INSERT fails on the primary
+# key, its submission rolls back with it and it answers from the first one's
+# row (KeyTaken).
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import mysql.connector
+
+KEYS_TABLE = "idempotency_keys"
+KEY_COLUMNS = ("key_hash", "request_hash", "status", "response", "expires_at")
+MAX_KEY_LENGTH = 255
+
+
+class KeyTaken(Exception):
+    """Another request saved this Idempotency-Key first; the submission was rolled back."""
+
+
+class Stored:
+    __slots__ = ("request_hash", "status", "body", "expires")
+
+    def __init__(self, request_hash, status, body, expires):
+        self.request_hash = request_hash
+        self.status = status
+        self.body = body
+        self.expires = expires
+
+
+def digest(scope, key):
+    return hashlib.blake2b(f"{scope}\0{key}".encode("utf-8"), digest_size=16).digest()
+
+
+def fingerprint(body):
+    """Hash of the raw request body; a key reused with a different body is refused."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class IdempotencyStore:
+    """Stored responses by key digest: memory first, then one primary-key read in MySQL.
+
+    Also tracks keys whose first request is still running in this process
+    (claim()), so a double submit is answered with 409 instead of racing the
+    first one. Across processes the primary key decides: the key row is a
+    plain INSERT, in the submission's transaction for a success (writer(),
+    then remember() after the commit) or on its own for other final answers
+    (save()).
+    """
+
+    PURGE_EVERY = 1000  # saves between DELETEs of expired rows
+
+    def __init__(self, get_connection, maxsize=10000, ttl=86400):
+        self.get_connection = get_connection
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {digest: Stored}, least recently used first
+        self._in_flight = set()
+        self._expired = set()  # claimed keys with an expired row still in the table
+        self._saves = 0
+
+        # --- Stats ---
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.saved = 0
+        self.conflicts = 0
+        self.errors = 0
+
+    # --- Lookup ---
+    def cached(self, key_digest, now=None):
+        """Stored response from memory only (no I/O), or None."""
+        now = now or time.time()
+        with self._lock:
+            stored = self._entries.get(key_digest)
+            if stored is None:
+                return None
+            if stored.expires <= now:
+                del self._entries[key_digest]
+                return None
+            self._entries.move_to_end(key_digest)
+            self.memory_hits += 1
+            return stored
+
+    def lookup(self, key_digest, now=None):
+        """Stored response for `key_digest` (memory, then MySQL), or None."""
+        now = now or time.time()
+        stored = self.cached(key_digest, now)
+        if stored is not None:
+            return stored
+        stored = self._fetch(key_digest, now)
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+            else:
+                self.db_hits += 1
+                self._remember(key_digest, stored)
+        return stored
+
+    def _fetch(self, key_digest, now):
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT request_hash, status, response, expires_at FROM {KEYS_TABLE} WHERE key_hash = %s",
+                    (key_digest,),
+                )
+                row = cursor.fetchone()
+                cursor.close()
+        except mysql.connector.Error as e:
+            self.errors += 1
+            print("❌ Idempotency Lookup Error:", e)
+            return None  # treated as a new key
+        if row is None:
+            return None
+        request_hash, status, body, expires = row
+        if expires.timestamp() <= now:
+            with self._lock:
+                self._expired.add(key_digest)  # not purged yet: the key row must replace it
+            return None
+        return Stored(bytes(request_hash), status, bytes(body), expires.timestamp())
+
+    # --- In-flight keys ---
+    def claim(self, key_digest):
+        """False if a request with this key is already running in this process."""
+        with self._lock:
+            if key_digest in self._in_flight:
+                self.conflicts += 1
+                return False
+            self._in_flight.add(key_digest)
+            return True
+
+    def release(self, key_digest):
+        with self._lock:
+            self._in_flight.discard(key_digest)
+            self._expired.discard(key_digest)
+
+    # --- Save ---
+    def row(self, key_digest, request_hash, status, body, now=None):
+        """KEY_COLUMNS values of the key row (e.g. for the write-behind queue)."""
+        now = now or time.time()
+        return (key_digest, request_hash, status, body, datetime.fromtimestamp(now + self.ttl))
+
+    def statements(self, key_digest, request_hash, status, body, now=None):
+        """[(sql, params)] that write the key row; run them in the caller's transaction."""
+        now = now or time.time()
+        with self._lock:
+            expired = key_digest in self._expired
+        statements = []
+        if expired:
+            statements.append((f"DELETE FROM {KEYS_TABLE} WHERE key_hash = %s AND expires_at <= %s",
+                               (key_digest, datetime.fromtimestamp(now))))
+        statements.append((
+            f"INSERT INTO {KEYS_TABLE} ({', '.join(KEY_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)",
+            self.row(key_digest, request_hash, status, body, now),
+        ))
+        return statements
+
+    def taken(self):
+        """Count a key INSERT that lost to another request (see KeyTaken)."""
+        with self._lock:
+            self.conflicts += 1
+
+    def writer(self, key_digest, request_hash, status, body, enqueue=None):
+        """`enqueue(cursor, table, rows, ids)` for storage.insert that also writes the key row.
+
+        Raises KeyTaken when the key was saved first by another request, which
+        rolls the submission back with it.
+        """
+        statements = self.statements(key_digest, request_hash, status, body)
+
+        def write(cursor, table, rows, ids):
+            if enqueue is not None:
+                enqueue(cursor, table, rows, ids)
+            try:
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+            except mysql.connector.Error as e:
+                if e.errno != 1062:  # Duplicate entry
+                    raise
+                self.taken()
+                raise KeyTaken() from e
+        return write
+
+    def remember(self, key_digest, request_hash, status, body, now=None):
+        """Cache a response whose key row was committed (or queued) with the submission.
+
+        True when expired rows are due to be purged (call purge(), off the event loop).
+        """
+        now = now or time.time()
+        with self._lock:
+            self._remember(key_digest, Stored(request_hash, status, body, now + self.ttl))
+            self.saved += 1
+            self._saves += 1
+            return self._saves % self.PURGE_EVERY == 0
+
+    def save(self, key_digest, request_hash, status, body, now=None):
+        """Store a final answer that wrote nothing else (a duplicate, a validation error).
+
+        The first saved response wins: if another request saved the key in the
+        meantime, this one is not kept.
+        """
+        now = now or time.time()
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    for sql, params in self.statements(key_digest, request_hash, status, body, now):
+                        cursor.execute(sql, params)
+                    conn.commit()
+                except mysql.connector.Error as e:
+                    if e.errno != 1062:  # Duplicate entry
+                        raise
+                    self.taken()
+                    return
+                finally:
+                    cursor.close()
+        except mysql.connector.Error as e:
+            with self._lock:
+                self.errors += 1
+            print("❌ Idempotency Save Error:", e)  # still answered from memory in this process
+        if self.remember(key_digest, request_hash, status, body, now):
+            self.purge(now)
+
+    def purge(self, now=None):
+        """DELETE the expired key rows."""
+        now = now or time.time()
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"DELETE FROM {KEYS_TABLE} WHERE expires_at <= %s", (datetime.fromtimestamp(now),))
+                conn.commit()
+                cursor.close()
+        except mysql.connector.Error as e:
+            with self._lock:
+                self.errors += 1
+            print("❌ Idempotency Purge Error:", e)
+
+    def _remember(self, key_digest, stored):
+        # Caller holds self._lock.
+        self._entries[key_digest] = stored
+        self._entries.move_to_end(key_digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "in_flight": len(self._in_flight),
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "saved": self.saved,
+                "conflicts": self.conflicts,
+                "errors": self.errors,
+            }
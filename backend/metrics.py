@@ -0,0 +1,332 @@
+# /backend/metrics.py
+#
+# Minimal Prometheus-format metrics: counters, histograms and scrape-time
+# gauges, rendered in the text exposition format by render(). Each metric
+# child is a few ints behind one lock, so it is cheap enough to leave on.
+#
+# Under pre-forked workers every process has its own registry, so a scrape
+# must not answer with whichever worker it lands on. After use_directory()
+# each process writes a snapshot of its samples to that directory (every
+# SYNC_INTERVAL seconds and on every scrape), and render() sums the
+# snapshots of all processes. Counters and histograms of exited workers
+# stay in the sum, so totals never go backwards; scrape-time gauges
+# (pool connections, queue depth) only count live processes.
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; spans a cached MX hit (~µs) up to a resolver timeout.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+SYNC_INTERVAL = 1.0  # seconds between snapshot writes per process
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        _registry.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    # Only scrape-time gauges describe the current state of a process rather than a running total.
+    live_only = False
+
+    def samples(self):
+        """{label values tuple: value} for this process."""
+        with self._lock:
+            children = list(self._children.items())
+        return {values: self._sample(child) for values, child in children}
+
+    def merge(self, a, b):
+        return a + b
+
+    def render(self, samples=None):
+        samples = self.samples() if samples is None else samples
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in sorted(samples.items()):
+            lines.extend(self._render_sample(values, value))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _sample(self, child):
+        return child.value
+
+    def _render_sample(self, values, value):
+        yield f"{self.name}{_labels(self.labelnames, values)} {value}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _sample(self, child):
+        with child._lock:
+            return [list(child.counts), child.sum]
+
+    def merge(self, a, b):
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1]]
+
+    def _render_sample(self, values, value):
+        counts, total = value
+        names = self.labelnames + ("le",)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{self.name}_bucket{_labels(names, values + (le,))} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, values)} {total}"
+        yield f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """Gauge read at scrape time from `collect()`, which returns {label values tuple: value}."""
+
+    kind = "gauge"
+    live_only = True
+
+    def __init__(self, name, help, collect, labelnames=()):
+        self.collect = collect
+        super().__init__(name, help, labelnames)
+
+    def samples(self):
+        return dict(self.collect())
+
+    def _render_sample(self, values, value):
+        yield f"{self.name}{_labels(self.labelnames, values)} {value}"
+
+
+class CollectedCounter(Gauge):
+    """Monotonic total read at scrape time (e.g. a component's own stats() counter)."""
+
+    kind = "counter"
+    live_only = False
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format (all processes after use_directory())."""
+    merged = _merged() if _directory is not None else None
+    lines = []
+    for metric in _registry:
+        try:
+            lines.extend(metric.render(None if merged is None else merged.get(metric.name, {})))
+        except Exception as e:
+            print(f"❌ Metrics Error ({metric.name}):", e)
+    return "\n".join(lines) + "\n"
+
+
+# --- Multi-process aggregation ---
+_directory = None
+_snapshot_path = None
+_sync_thread = None
+_sync_stop = threading.Event()
+
+
+def use_directory(path, clear=False):
+    """Aggregate across processes through snapshot files in `path` (set in the server master, before forking)."""
+    global _directory
+    os.makedirs(path, exist_ok=True)
+    if clear:  # a fresh server run starts every total from zero
+        for name in os.listdir(path):
+            if name.startswith("metrics-") and name.endswith(".json"):
+                os.remove(os.path.join(path, name))
+    _directory = path
+
+
+def directory():
+    return _directory
+
+
+def _snapshot(alive=True):
+    metrics = {}
+    for metric in _registry:
+        if metric.live_only and not alive:
+            continue
+        try:
+            samples = metric.samples()
+        except Exception as e:
+            print(f"❌ Metrics Error ({metric.name}):", e)
+            continue
+        metrics[metric.name] = [[list(values), value] for values, value in samples.items()]
+    return {"pid": os.getpid(), "metrics": metrics}
+
+
+def write_snapshot(alive=True):
+    """Write this process's samples to its snapshot file (alive=False drops its live-only gauges)."""
+    global _snapshot_path
+    if _directory is None:
+        return
+    if _snapshot_path is None:
+        # pid + start time: a recycled pid must not overwrite an exited worker's totals.
+        _snapshot_path = os.path.join(_directory, f"metrics-{os.getpid()}-{time.time_ns()}.json")
+    tmp = _snapshot_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_snapshot(alive), f)
+    os.replace(tmp, _snapshot_path)
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merged():
+    """{metric name: {label values tuple: value}} summed over every process's snapshot."""
+    try:
+        write_snapshot()
+    except OSError as e:
+        print("❌ Metrics Snapshot Error:", e)
+    by_name = {metric.name: metric for metric in _registry}
+    merged = {name: {} for name in by_name}
+    for name in os.listdir(_directory):
+        if not (name.startswith("metrics-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(_directory, name), encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed or being replaced
+        alive = _is_alive(snapshot["pid"])
+        for metric_name, samples in snapshot["metrics"].items():
+            metric = by_name.get(metric_name)
+            if metric is None or (metric.live_only and not alive):
+                continue
+            target = merged[metric_name]
+            for values, value in samples:
+                values = tuple(values)
+                target[values] = metric.merge(target[values], value) if values in target else value
+    return merged
+
+
+def start_sharing(interval=SYNC_INTERVAL):
+    """Start writing this process's snapshot every `interval` seconds (call in each worker)."""
+    global _sync_thread, _snapshot_path
+    if _directory is None or _sync_thread is not None:
+        return
+    _snapshot_path = None  # forked: this process gets its own file
+    _sync_stop.clear()
+
+    def run():
+        while not _sync_stop.wait(interval):
+            try:
+                write_snapshot()
+            except OSError as e:
+                print("❌ Metrics Snapshot Error:", e)
+
+    _sync_thread = threading.Thread(target=run, name="metrics-sync", daemon=True)
+    _sync_thread.start()
+
+
+def stop_sharing():
+    """Final snapshot of this process's totals, without its live gauges (worker exit)."""
+    global _sync_thread
+    if _directory is None:
+        return
+    _sync_stop.set()
+    if _sync_thread is not None:
+        _sync_thread.join(SYNC_INTERVAL * 2)
+        _sync_thread = None
+    try:
+        write_snapshot(alive=False)
+    except OSError as e:
+        print("❌ Metrics Snapshot Error:", e)
+
+
+# --- Application Metrics ---
+stage_seconds = Histogram(
+    "form_stage_seconds", "Time spent in each submission stage.", ("stage",),
+)
+request_seconds = Histogram(
+    "form_request_seconds", "Submission handler latency.", ("endpoint",),
+)
+submissions = Counter(
+    "form_submissions_total", "Submissions by endpoint and outcome.", ("endpoint", "outcome"),
+)
+
+
+def observe_stage(name, seconds):
+    """backend.timing observer."""
+    stage_seconds.labels(name).observe(seconds)
+
+
+def outcome(status, override=None):
+    """success / duplicate / 400 / 429 / 500 / ... for a response status."""
+    if override:
+        return override
+    return "success" if status == 200 else str(status)
@@ -0,0 +1,210 @@
+# /backend/migrations.py
+#
+# Versioned schema migrations. Each migration is idempotent (CREATE ... IF NOT
+# EXISTS, ensure_column / ensure_index), because MySQL commits DDL implicitly:
+# a run interrupted halfway is finished by simply running again. Applied
+# versions are recorded in `schema_version`.
+#
+#   python -m backend.migrations            # apply pending migrations
+#   python -m backend.migrations --status   # show current / latest version
+#
+# Servers never run DDL on boot; they call check() (one SELECT) and warn when
+# the schema is behind, unless MIGRATE_ON_START=1.
+
+import argparse
+
+import mysql.connector
+
+from .config import DB_HOST, DB_USER, DB_PASS, DB_NAME, MIGRATE_ON_START
+from .db_schema import (
+    CONTACT_MESSAGES, IDEMPOTENCY_KEYS, NOTIFICATION_OUTBOX, SERVICE_REQUESTS, SERVICE_INDEXES, drop_index, ensure_column, ensure_index,
+)
+from .dedupe import content_hash
+
+MIGRATIONS = []  # (version, name, apply(cursor, database)), kept sorted by version
+LOCK_NAME = f"{DB_NAME}.schema_migrations"
+LOCK_TIMEOUT = 300  # seconds to wait for another runner
+last_check = None   # result of the last check() in this process (inherited by forked workers)
+
+
+def migration(version, name):
+    """Register `apply(cursor, database)` as migration `version`."""
+    def register(apply):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"duplicate migration version {version}")
+        MIGRATIONS.append((version, name, apply))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return apply
+    return register
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# --- Migrations ---
+@migration(1, "create contact_messages")
+def create_contact_messages(cursor, database):
+    cursor.execute(CONTACT_MESSAGES)
+
+
+@migration(2, "create service_requests")
+def create_service_requests(cursor, database):
+    cursor.execute(SERVICE_REQUESTS)
+
+
+@migration(3, "add service_requests.priority")
+def add_priority(cursor, database):
+    # Tables created by the old combined app.py have no priority column.
+    ensure_column(cursor, database, "service_requests", "priority", "INT NOT NULL DEFAULT 3 AFTER details")
+
+
+@migration(4, "index (email, created_at) for cooldown lookups")
+def add_email_created_indexes(cursor, database):
+    ensure_index(cursor, database, "contact_messages", "idx_email_created", ("email", "created_at"))
+    ensure_index(cursor, database, "service_requests", "idx_email_created", ("email", "created_at"))
+
+
+@migration(5, "service_requests dashboard indexes")
+def add_service_indexes(cursor, database):
+    for name, columns in SERVICE_INDEXES.items():
+        ensure_index(cursor, database, "service_requests", name, columns)
+
+
+@migration(6, "contact_messages.content_hash replaces unique_email_message")
+def add_content_hash(cursor, database):
+    # The (email, message(255)) prefix key only compared the first 255 characters.
+    # Full-content duplicates cannot already exist (they share that prefix), so the
+    # unique hash index can be built once every row has its hash.
+    ensure_column(cursor, database, "contact_messages", "content_hash", "BINARY(16) NULL")
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT id, email, message FROM contact_messages
+            WHERE id > %s AND content_hash IS NULL ORDER BY id LIMIT 1000
+        """, (last_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        cursor.executemany(
+            "UPDATE contact_messages SET content_hash = %s WHERE id = %s",
+            [(content_hash(email, message), row_id) for row_id, email, message in rows],
+        )
+        cursor.execute("COMMIT")
+        last_id = rows[-1][0]
+    ensure_index(cursor, database, "contact_messages", "uniq_content_hash", ("content_hash",), unique=True)
+    drop_index(cursor, database, "contact_messages", "unique_email_message")
+
+
+@migration(7, "index contact_messages (created_at) for the retention archiver")
+def add_contact_created_index(cursor, database):
+    ensure_index(cursor, database, "contact_messages", "idx_created", ("created_at",))
+
+
+@migration(8, "create notification_outbox")
+def create_notification_outbox(cursor, database):
+    cursor.execute(NOTIFICATION_OUTBOX)
+
+
+@migration(9, "create idempotency_keys")
+def create_idempotency_keys(cursor, database):
+    cursor.execute(IDEMPOTENCY_KEYS)
+
+
+# --- Runner ---
+def _applied(cursor):
+    cursor.execute("SELECT version FROM schema_version")
+    return {version for (version,) in cursor.fetchall()}
+
+
+def migrate(target=None):
+    """Apply every pending migration up to `target` (default: latest). Returns the versions applied."""
+    conn = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASS)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
+    cursor.execute(f"USE {DB_NAME}")
+
+    # One runner at a time (several servers may start with MIGRATE_ON_START=1).
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        conn.close()
+        raise RuntimeError("another migration run holds the schema lock")
+    applied = []
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        done = _applied(cursor)
+        for version, name, apply in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            print(f"🔧 Applying migration {version:03d}: {name}")
+            apply(cursor, DB_NAME)
+            cursor.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append(version)
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+    print(f"✅ Database '{DB_NAME}' schema is at version {max(done | set(applied), default=0)}.")
+    return applied
+
+
+def current_version(get_connection):
+    """Highest applied version (0 when schema_version does not exist yet)."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+            return cursor.fetchone()[0] or 0
+        except mysql.connector.Error as e:
+            if e.errno != 1146:  # Table doesn't exist
+                raise
+            return 0
+        finally:
+            cursor.close()
+
+
+def check(get_connection, auto_migrate=MIGRATE_ON_START):
+    """Cheap startup check: True when the schema is current (migrating first if `auto_migrate`)."""
+    global last_check
+    try:
+        if auto_migrate:
+            migrate()
+        version = current_version(get_connection)
+    except Exception as e:
+        print("❌ Schema Check Error:", e)
+        last_check = False
+        return False
+    if version < latest_version():
+        print(f"❌ Database schema is at version {version}, code expects {latest_version()}. "
+              "Run: python -m backend.migrations")
+        last_check = False
+        return False
+    last_check = True
+    return True
+
+
+if __name__ == "__main__":
+    from .config import STORAGE
+    if STORAGE == "sqlite":
+        raise SystemExit("✅ STORAGE=sqlite: the schema is created when the database file is opened.")
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="show versions without migrating")
+    parser.add_argument("--target", type=int, help="migrate up to this version only")
+    args = parser.parse_args()
+    if args.status:
+        from . import core
+        current = current_version(core.get_db_connection)
+        print(f"Schema version {current}, latest {latest_version()}.")
+        for version, name, _ in MIGRATIONS:
+            print(f"  {'✅' if version <= current else '  '} {version:03d} {name}")
+    else:
+        migrate(args.target)
@@ -0,0 +1,178 @@
+# /backend/mx_cache.py
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+import dns.resolver
+
+# Answers that prove the domain cannot receive mail; safe to cache as negative.
+NEGATIVE_ERRORS = (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)
+
+
+class _Flight:
+    """A lookup in progress; concurrent callers for the same domain wait on it."""
+
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = False
+
+
+class MXCache:
+    """Domain-level MX cache with TTL, LRU eviction and single-flight lookups.
+
+    Positive answers are kept for the record TTL (clamped to
+    [min_ttl, max_ttl]); NXDOMAIN / no-MX answers for `negative_ttl`.
+    Timeouts and resolver failures are not cached.
+    """
+
+    WAIT_GRACE = 1.0  # seconds a coalesced caller waits beyond the leader's resolver timeout
+
+    def __init__(self, maxsize=10000, timeout=2.0, min_ttl=60, max_ttl=3600, negative_ttl=300, resolver=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.resolver = resolver or dns.resolver.Resolver()
+        self.async_resolver = None  # dns.asyncresolver.Resolver, created on first async lookup
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {domain: (has_mx, expires_at)}
+        self._flights = {}             # {domain: _Flight}
+        self._async_flights = {}       # {domain: asyncio.Future}, event loop thread only
+
+        # --- Stats ---
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.errors = 0
+        self.wait_timeouts = 0
+
+    def has_mx(self, domain):
+        """True if `domain` publishes MX records, answered from cache when possible."""
+        domain = domain.lower().rstrip(".")
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._get(domain, now)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            flight = self._flights.get(domain)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                flight = self._flights[domain] = _Flight()
+                leader = True
+
+        if not leader:
+            # The leader's resolver can take its whole lifetime; allow for it finishing late.
+            if flight.event.wait(self.timeout + self.WAIT_GRACE):
+                return flight.result
+            with self._lock:
+                self.wait_timeouts += 1
+                cached = self._get(domain, time.monotonic())
+            # No answer in time: fail open rather than reject a possibly valid address.
+            return True if cached is None else cached
+
+        try:
+            flight.result = self._resolve(domain)
+        finally:
+            with self._lock:
+                self._flights.pop(domain, None)
+            flight.event.set()
+        return flight.result
+
+    async def has_mx_async(self, domain):
+        """Asyncio variant of has_mx(); shares the cache, coalesces lookups per event loop."""
+        domain = domain.lower().rstrip(".")
+        with self._lock:
+            cached = self._get(domain, time.monotonic())
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        flight = self._async_flights.get(domain)
+        if flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(flight)
+
+        self.misses += 1
+        flight = self._async_flights[domain] = asyncio.get_running_loop().create_future()
+        result = False
+        try:
+            if self.async_resolver is None:
+                import dns.asyncresolver
+                self.async_resolver = dns.asyncresolver.Resolver()
+            try:
+                answer = await self.async_resolver.resolve(domain, "MX", lifetime=self.timeout)
+            except Exception as e:
+                result = self._store_failure(domain, e)
+            else:
+                result = self._store_answer(domain, answer)
+        finally:
+            del self._async_flights[domain]
+            flight.set_result(result)
+        return result
+
+    def _resolve(self, domain):
+        try:
+            answer = self.resolver.resolve(domain, "MX", lifetime=self.timeout)
+        except Exception as e:
+            return self._store_failure(domain, e)
+        return self._store_answer(domain, answer)
+
+    def _store_answer(self, domain, answer):
+        ttl = answer.rrset.ttl if answer.rrset is not None else self.min_ttl
+        self._put(domain, True, min(max(ttl, self.min_ttl), self.max_ttl))
+        return True
+
+    def _store_failure(self, domain, error):
+        if isinstance(error, NEGATIVE_ERRORS):
+            self._put(domain, False, self.negative_ttl)
+        else:
+            # Timeouts / resolver failures: answer False but let the next request retry.
+            with self._lock:
+                self.errors += 1
+        return False
+
+    # --- LRU storage (callers hold self._lock for _get) ---
+    def _get(self, domain, now):
+        entry = self._entries.get(domain)
+        if entry is None:
+            return None
+        has_mx, expires_at = entry
+        if expires_at <= now:
+            del self._entries[domain]
+            return None
+        self._entries.move_to_end(domain)
+        return has_mx
+
+    def _put(self, domain, has_mx, ttl):
+        with self._lock:
+            self._entries[domain] = (has_mx, time.monotonic() + ttl)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Snapshot of cache counters for monitoring."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "wait_timeouts": self.wait_timeouts,
+            }
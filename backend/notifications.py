@@ -0,0 +1,324 @@
+# /backend/notifications.py
+#
+# Transactional outbox for "new submission" alerts. The insert path writes
+# one notification_outbox row per configured channel in the same transaction
+# as the submission, so an alert exists exactly when the row does; a small
+# pool of worker threads claims due rows in batches and delivers them
+# (webhook POST with a JSON array, SMTP digest email), retrying failures with
+# exponential backoff. The request thread never talks to the webhook or the
+# mail server.
+#
+# Claims are optimistic (candidate SELECT, then a conditional UPDATE with a
+# per-claim token and lease), so several processes can run dispatchers on
+# one table. Delivery is at-least-once; webhook receivers can deduplicate on
+# `notification_id`.
+#
+#   python -m backend.notifications     # workers only, e.g. next to the ASGI app
+
+import hashlib
+import hmac
+import json
+import random
+import smtplib
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+OUTBOX_TABLE = "notification_outbox"
+OUTBOX_INSERT = f"INSERT INTO {OUTBOX_TABLE} (channel, source_table, source_id, payload) VALUES (%s, %s, %s, %s)"
+EVENTS = {"contact_messages": "contact_message", "service_requests": "service_request"}
+
+
+def event(table, row_id, row):
+    """Notification payload for one stored row (the dedupe hash is left out)."""
+    return {
+        "event": EVENTS.get(table, table),
+        "id": row_id,
+        "fields": {field: value for field, value in row.items() if field != "content_hash"},
+    }
+
+
+# --- Senders (send(events) raises on failure; the whole batch is retried) ---
+class WebhookSender:
+    """POSTs {"events": [...]} as JSON; any non-2xx answer is a failure.
+
+    With a secret, the body is signed: X-Signature: sha256=<hex hmac>.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url, secret="", timeout=10.0):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps({"events": events}, default=str, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json", "User-Agent": "contact-backend-notifier"}
+        if self.secret:
+            digest = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={digest}"
+        req = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+
+class SMTPSender:
+    """One digest email per batch, over a single SMTP connection."""
+
+    name = "smtp"
+
+    def __init__(self, host, port, sender, recipients, user="", password="", starttls=True, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def message(self, events):
+        msg = EmailMessage()
+        if len(events) == 1:
+            fields = events[0]["fields"]
+            kind = "contact message" if events[0]["event"] == "contact_message" else "service request"
+            msg["Subject"] = f"New {kind} from {fields.get('name', '')}"
+        else:
+            msg["Subject"] = f"{len(events)} new submissions"
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        parts = []
+        for e in events:
+            lines = [f"{e['event']} #{e['id']}" if e["id"] else e["event"]]
+            lines += [f"  {field}: {value}" for field, value in e["fields"].items() if value not in (None, "")]
+            parts.append("\n".join(lines))
+        msg.set_content("\n\n".join(parts) + "\n")
+        return msg
+
+    def send(self, events):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+            smtp.send_message(self.message(events))
+
+
+class Dispatcher:
+    """Outbox writer (enqueue) and worker pool (start/stop).
+
+    Rows are deleted once delivered; after `max_attempts` failures a row is
+    marked 'dead' and kept for inspection.
+    """
+
+    def __init__(self, get_connection, senders, workers=2, batch_size=50, max_attempts=8,
+                 retry_base=5.0, retry_max=3600.0, poll_interval=2.0, lease=60.0):
+        self.get_connection = get_connection
+        self.senders = {sender.name: sender for sender in senders}
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.lease = lease                  # seconds a claim is held before another worker may retry it
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        # --- Stats ---
+        self.enqueued = 0
+        self.delivered = {name: 0 for name in self.senders}
+        self.failed = {name: 0 for name in self.senders}
+        self.dead = 0
+        self.batches = 0
+        self.last_error = None
+
+    @property
+    def enabled(self):
+        return bool(self.senders)
+
+    # --- Producer (inside the caller's transaction) ---
+    def outbox_rows(self, table, rows, ids=None):
+        """OUTBOX_INSERT parameters: one row per channel per submission."""
+        params = []
+        for i, row in enumerate(rows):
+            payload = json.dumps(event(table, ids[i] if ids else None, row), default=str, ensure_ascii=False)
+            for channel in self.senders:
+                params.append((channel, table, ids[i] if ids else None, payload))
+        return params
+
+    def enqueue(self, cursor, table, rows, ids=None):
+        """Write outbox rows with `cursor`; committed (or rolled back) with the submission."""
+        if not self.senders:
+            return
+        params = self.outbox_rows(table, rows, ids)
+        cursor.executemany(OUTBOX_INSERT, params)
+        with self._lock:
+            self.enqueued += len(params)
+
+    def wake(self):
+        """Hint that new rows were committed (saves waiting for the next poll)."""
+        if self._threads:
+            self._wake.set()
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._threads or not self.senders:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"notify-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                busy = self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print("❌ Notification Worker Error:", e)
+                busy = False
+            if not busy:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    # --- Worker ---
+    def run_once(self, now=None):
+        """Claim and deliver one batch; returns the number of rows handled."""
+        now = now or datetime.now()
+        claimed = self._claim(now)
+        if not claimed:
+            return 0
+        by_channel = {}
+        for row_id, channel, payload, attempts in claimed:
+            by_channel.setdefault(channel, []).append((row_id, payload, attempts))
+        for channel, items in by_channel.items():
+            sender = self.senders.get(channel)
+            try:
+                if sender is None:
+                    raise RuntimeError(f"no sender configured for channel '{channel}'")
+                events = []
+                for row_id, payload, _ in items:
+                    e = json.loads(payload)
+                    e["notification_id"] = row_id
+                    events.append(e)
+                sender.send(events)
+            except Exception as e:
+                self._failed(channel, items, e, now)
+            else:
+                self._delivered(channel, items)
+        with self._lock:
+            self.batches += 1
+        return len(claimed)
+
+    def _claim(self, now):
+        token = uuid.uuid4().hex
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id FROM {OUTBOX_TABLE} WHERE status = 'pending' "
+                f"AND (next_attempt_at IS NULL OR next_attempt_at <= %s) "
+                f"AND (claimed_until IS NULL OR claimed_until < %s) ORDER BY id LIMIT %s",
+                (now, now, self.batch_size),
+            )
+            ids = [row_id for (row_id,) in cursor.fetchall()]
+            if not ids:
+                cursor.close()
+                return []
+            placeholders = ", ".join(["%s"] * len(ids))
+            # Conditional UPDATE: rows another worker claimed in the meantime are skipped.
+            cursor.execute(
+                f"UPDATE {OUTBOX_TABLE} SET claim_token = %s, claimed_until = %s "
+                f"WHERE id IN ({placeholders}) AND status = 'pending' "
+                f"AND (claimed_until IS NULL OR claimed_until < %s)",
+                (token, now + timedelta(seconds=self.lease), *ids, now),
+            )
+            conn.commit()
+            cursor.execute(
+                f"SELECT id, channel, payload, attempts FROM {OUTBOX_TABLE} WHERE claim_token = %s ORDER BY id",
+                (token,),
+            )
+            claimed = cursor.fetchall()
+            cursor.close()
+        return claimed
+
+    def _delivered(self, channel, items):
+        ids = [row_id for row_id, _, _ in items]
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"DELETE FROM {OUTBOX_TABLE} WHERE id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+            conn.commit()
+            cursor.close()
+        with self._lock:
+            self.delivered[channel] = self.delivered.get(channel, 0) + len(ids)
+
+    def backoff(self, attempts):
+        """Seconds before retry number `attempts` (exponential, capped, +-20% jitter)."""
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _failed(self, channel, items, exc, now):
+        error = f"{type(exc).__name__}: {exc}"[:255]
+        updates, dead = [], 0
+        for row_id, _, attempts in items:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                updates.append(("dead", attempts, None, error, row_id))
+                dead += 1
+            else:
+                updates.append(("pending", attempts, now + timedelta(seconds=self.backoff(attempts)), error, row_id))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                f"UPDATE {OUTBOX_TABLE} SET status = %s, attempts = %s, next_attempt_at = %s, last_error = %s, "
+                f"claim_token = NULL, claimed_until = NULL WHERE id = %s",
+                updates,
+            )
+            conn.commit()
+            cursor.close()
+        with self._lock:
+            self.failed[channel] = self.failed.get(channel, 0) + len(items)
+            self.dead += dead
+            self.last_error = error
+        print(f"❌ Notification Delivery Error ({channel}, {len(items) - dead} to retry, {dead} given up):", error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channels": list(self.senders),
+                "workers": len(self._threads),
+                "enqueued": self.enqueued,
+                "delivered": dict(self.delivered),
+                "failed_attempts": dict(self.failed),
+                "dead": self.dead,
+                "batches": self.batches,
+                "last_error": self.last_error,
+            }
+
+
+if __name__ == "__main__":
+    from . import core
+    if not core.notifier.enabled:
+        raise SystemExit("❌ No notification channel configured (NOTIFY_WEBHOOK_URL / NOTIFY_SMTP_HOST + NOTIFY_TO).")
+    core.notifier.start()
+    print(f"✅ Delivering notifications via {', '.join(core.notifier.senders)} "
+          f"with {core.notifier.workers} workers.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        core.notifier.stop()
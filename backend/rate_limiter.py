@@ -0,0 +1,434 @@
+# /backend/rate_limiter.py
+
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import closing
+
+_NEVER = float("-inf")
+
+
+class SlidingWindowLimiter:
+    """Per-key sliding-window limiter: at most `limit` hits per `window` seconds.
+
+    Each key owns a fixed-size ring buffer of its last `limit` hit times, so a
+    check is O(1): the hit is allowed iff the oldest slot has left the window.
+    Keys are spread over lock-striped shards; idle keys are evicted lazily on
+    access and the total number of tracked keys is capped at `max_keys`
+    (least recently seen keys are dropped first).
+    """
+
+    EVICT_PER_CHECK = 2  # idle keys examined per check (amortized cleanup)
+
+    def __init__(self, limit, window=60.0, max_keys=100000, stripes=16):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        if stripes & (stripes - 1):
+            raise ValueError("stripes must be a power of two")
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._mask = stripes - 1
+        self._per_stripe = max(1, max_keys // stripes)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # {key: array('d', [head, t0, ..., t(limit-1)])}, ordered by last check
+        self._shards = [OrderedDict() for _ in range(stripes)]
+        self.evictions = 0
+
+    def hit(self, key, now=None):
+        """Record a hit for `key`; return False if it exceeds the limit."""
+        if now is None:
+            now = time.monotonic()
+        limit = self.limit
+        cutoff = now - self.window
+        i = hash(key) & self._mask
+        shard = self._shards[i]
+
+        with self._locks[i]:
+            ring = shard.get(key)
+            if ring is None:
+                self._evict(shard, cutoff)
+                ring = array("d", [_NEVER] * (limit + 1))
+                ring[0] = 0.0
+                shard[key] = ring
+            else:
+                shard.move_to_end(key)
+
+            head = int(ring[0])
+            if ring[head + 1] > cutoff:
+                return False  # `limit` hits already inside the window
+            ring[head + 1] = now
+            ring[0] = (head + 1) % limit
+            return True
+
+    def _evict(self, shard, cutoff):
+        limit = self.limit
+        for _ in range(self.EVICT_PER_CHECK):
+            if not shard:
+                return
+            key, ring = next(iter(shard.items()))
+            newest = ring[(int(ring[0]) - 1) % limit + 1]
+            if newest > cutoff:
+                break
+            del shard[key]
+            self.evictions += 1
+        while len(shard) >= self._per_stripe:
+            shard.popitem(last=False)
+            self.evictions += 1
+
+    def reset(self, key):
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            self._shards[i].pop(key, None)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def stats(self):
+        """Snapshot of limiter counters for monitoring."""
+        return {
+            "backend": "memory",
+            "keys": len(self),
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+        }
+
+
+class QuotaLimiter:
+    """Fixed-window item quota per key: at most `limit` items per `window` seconds.
+
+    Used for authenticated bulk callers, where one request carries many
+    items; take() is all-or-nothing so a batch is never half accepted, and
+    refund() gives back items that were not stored. In-process only: with N
+    server workers each keeps its own count, so use SQLiteQuota /
+    RedisQuota (make_quota) there.
+    """
+
+    def __init__(self, limit, window=3600.0):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows = {}  # {key: [window_start, used]}
+        self.rejected = 0
+
+    def take(self, key, n, now=None):
+        """Consume `n` items for `key`; returns (ok, remaining, seconds until the window resets)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                entry = self._windows[key] = [now - now % self.window, 0]
+            reset_in = entry[0] + self.window - now
+            if entry[1] + n > self.limit:
+                self.rejected += 1
+                return False, self.limit - entry[1], reset_in
+            entry[1] += n
+            return True, self.limit - entry[1], reset_in
+
+    def refund(self, key, n, now=None):
+        """Give back `n` items taken in the current window (no-op once it has reset)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] = max(0, entry[1] - n)
+
+    def stats(self):
+        with self._lock:
+            used = {key: used for key, (_, used) in self._windows.items()}
+        return {"backend": "memory", "limit": self.limit, "window": self.window, "used": used, "rejected": self.rejected}
+
+
+# --- Shared backends (multi-worker / multi-node) ---
+class _SQLiteState:
+    """One SQLite file (WAL mode) shared by all worker processes on one host; a connection per thread."""
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        # One connection per thread, reopened after fork.
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = self._connect()
+            local.pid = os.getpid()
+        return local.conn
+
+
+class SQLiteLimiter(_SQLiteState):
+    """Sliding-window limiter shared by all worker processes on one host.
+
+    State lives in a SQLite file (WAL mode); each decision is a single
+    `BEGIN IMMEDIATE` transaction, so concurrent workers serialize on it.
+    """
+
+    CLEANUP_EVERY = 1000  # checks between sweeps of idle keys
+
+    def __init__(self, path, limit, window=60.0, namespace="ip", busy_timeout=5.0):
+        super().__init__(path, busy_timeout)
+        self.limit = limit
+        self.window = window
+        self.namespace = namespace
+        self._checks = 0
+        self.errors = 0
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_hits (
+                    key TEXT NOT NULL,
+                    ts REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limit_key_ts ON rate_limit_hits (key, ts)")
+
+    def hit(self, key, now=None):
+        if now is None:
+            now = time.time()
+        key = f"{self.namespace}:{key}"
+        cutoff = now - self.window
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM rate_limit_hits WHERE key = ? AND ts <= ?", (key, cutoff))
+                (count,) = conn.execute("SELECT COUNT(*) FROM rate_limit_hits WHERE key = ?", (key,)).fetchone()
+                allowed = count < self.limit
+                if allowed:
+                    conn.execute("INSERT INTO rate_limit_hits (key, ts) VALUES (?, ?)", (key, now))
+                self._checks += 1
+                if self._checks % self.CLEANUP_EVERY == 0:
+                    conn.execute("DELETE FROM rate_limit_hits WHERE ts <= ?", (cutoff,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return allowed
+        except Exception as e:
+            # Fail open: a broken limiter store must not take the forms down.
+            self.errors += 1
+            print("❌ Rate Limiter Error:", e)
+            return True
+
+    def stats(self):
+        return {"backend": "sqlite", "checks": self._checks, "errors": self.errors}
+
+
+class RedisLimiter:
+    """Sliding-window limiter shared across hosts through Redis.
+
+    Each decision is one EVALSHA round trip running a Lua script over a
+    sorted set per key, timed with the Redis server clock. `client` is any
+    redis-py compatible client (e.g. `redis.Redis` or `fakeredis.FakeRedis`
+    for local testing).
+    """
+
+    SCRIPT = """
+        local key = KEYS[1]
+        local window = tonumber(ARGV[1])
+        local limit = tonumber(ARGV[2])
+        local t = redis.call('TIME')
+        local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+        if redis.call('ZCARD', key) >= limit then
+            return 0
+        end
+        redis.call('ZADD', key, now, t[1] .. '.' .. t[2] .. ':' .. ARGV[3])
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+        return 1
+    """
+
+    def __init__(self, client, limit, window=60.0, prefix="rl:ip:"):
+        self.client = client
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url, limit, window=60.0, prefix="rl:ip:"):
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=1.0), limit, window, prefix)
+
+    def hit(self, key, now=None):
+        try:
+            return bool(self._script(keys=[self.prefix + key], args=[self.window, self.limit, os.urandom(6).hex()]))
+        except Exception as e:
+            # Fail open: a Redis outage must not take the forms down.
+            self.errors += 1
+            print("❌ Rate Limiter Error:", e)
+            return True
+
+    def stats(self):
+        return {"backend": "redis", "errors": self.errors}
+
+
+class SQLiteQuota(_SQLiteState):
+    """QuotaLimiter shared by all worker processes on one host (one row per key in a SQLite file)."""
+
+    def __init__(self, path, limit, window=3600.0, namespace="partner", busy_timeout=5.0):
+        super().__init__(path, busy_timeout)
+        self.limit = limit
+        self.window = window
+        self.namespace = namespace
+        self.rejected = 0
+        self.errors = 0
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quota_usage (
+                    key TEXT PRIMARY KEY,
+                    window_start REAL NOT NULL,
+                    used INTEGER NOT NULL
+                )
+            """)
+
+    def take(self, key, n, now=None):
+        now = time.time() if now is None else now
+        key = f"{self.namespace}:{key}"
+        start = now - now % self.window
+        reset_in = start + self.window - now
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT window_start, used FROM quota_usage WHERE key = ?", (key,)).fetchone()
+                used = row[1] if row and row[0] == start else 0
+                ok = used + n <= self.limit
+                if ok:
+                    used += n
+                    conn.execute("REPLACE INTO quota_usage (key, window_start, used) VALUES (?, ?, ?)", (key, start, used))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            # Fail open, like the limiters.
+            self.errors += 1
+            print("❌ Quota Error:", e)
+            return True, self.limit - n, reset_in
+        if not ok:
+            self.rejected += 1
+        return ok, self.limit - used, reset_in
+
+    def refund(self, key, n, now=None):
+        now = time.time() if now is None else now
+        try:
+            self._conn().execute(
+                "UPDATE quota_usage SET used = MAX(0, used - ?) WHERE key = ? AND window_start = ?",
+                (n, f"{self.namespace}:{key}", now - now % self.window),
+            )
+        except Exception as e:
+            self.errors += 1
+            print("❌ Quota Error:", e)
+
+    def stats(self):
+        now = time.time()
+        try:
+            rows = self._conn().execute("SELECT key, used FROM quota_usage WHERE window_start = ?",
+                                        (now - now % self.window,)).fetchall()
+            used = {key.partition(":")[2]: count for key, count in rows if key.startswith(self.namespace + ":")}
+        except Exception:
+            used = {}
+        return {"backend": "sqlite", "limit": self.limit, "window": self.window, "used": used,
+                "rejected": self.rejected, "errors": self.errors}
+
+
+class RedisQuota:
+    """QuotaLimiter shared across hosts: one counter per key and window, in one EVALSHA round trip."""
+
+    TAKE = """
+        local window = tonumber(ARGV[1])
+        local limit = tonumber(ARGV[2])
+        local n = tonumber(ARGV[3])
+        local now = tonumber(redis.call('TIME')[1])
+        local start = now - now % window
+        local key = KEYS[1] .. ':' .. start
+        local used = tonumber(redis.call('GET', key) or '0')
+        local reset_in = start + window - now
+        if used + n > limit then
+            return {0, limit - used, reset_in}
+        end
+        redis.call('INCRBY', key, n)
+        redis.call('EXPIRE', key, window)
+        return {1, limit - used - n, reset_in}
+    """
+    REFUND = """
+        local window = tonumber(ARGV[1])
+        local now = tonumber(redis.call('TIME')[1])
+        local key = KEYS[1] .. ':' .. (now - now % window)
+        local used = tonumber(redis.call('GET', key) or '0')
+        if used > 0 then
+            redis.call('DECRBY', key, math.min(used, tonumber(ARGV[2])))
+        end
+        return 1
+    """
+
+    def __init__(self, client, limit, window=3600, prefix="quota:partner:"):
+        self.client = client
+        self.limit = limit
+        self.window = int(window)
+        self.prefix = prefix
+        self._take = client.register_script(self.TAKE)
+        self._refund = client.register_script(self.REFUND)
+        self.rejected = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url, limit, window=3600, prefix="quota:partner:"):
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=1.0), limit, window, prefix)
+
+    def take(self, key, n, now=None):
+        try:
+            ok, remaining, reset_in = self._take(keys=[self.prefix + key], args=[self.window, self.limit, n])
+        except Exception as e:
+            # Fail open, like the limiters.
+            self.errors += 1
+            print("❌ Quota Error:", e)
+            return True, self.limit - n, self.window
+        if not ok:
+            self.rejected += 1
+        return bool(ok), remaining, reset_in
+
+    def refund(self, key, n, now=None):
+        try:
+            self._refund(keys=[self.prefix + key], args=[self.window, n])
+        except Exception as e:
+            self.errors += 1
+            print("❌ Quota Error:", e)
+
+    def stats(self):
+        return {"backend": "redis", "limit": self.limit, "window": self.window,
+                "rejected": self.rejected, "errors": self.errors}
+
+
+def make_limiter(backend, limit, window=60.0, max_keys=100000, sqlite_path=None, redis_url=None, namespace="ip"):
+    """Build the limiter selected by `backend`: "memory", "sqlite" or "redis"."""
+    if backend == "memory":
+        return SlidingWindowLimiter(limit, window=window, max_keys=max_keys)
+    if backend == "sqlite":
+        return SQLiteLimiter(sqlite_path, limit, window=window, namespace=namespace)
+    if backend == "redis":
+        return RedisLimiter.from_url(redis_url, limit, window=window, prefix=f"rl:{namespace}:")
+    raise ValueError(f"unknown rate limit backend: {backend!r}")
+
+
+def make_quota(backend, limit, window=3600, sqlite_path=None, redis_url=None, namespace="partner"):
+    """Build the item quota for `backend` (same choices as make_limiter)."""
+    if backend == "memory":
+        return QuotaLimiter(limit, window=window)
+    if backend == "sqlite":
+        return SQLiteQuota(sqlite_path, limit, window=window, namespace=namespace)
+    if backend == "redis":
+        return RedisQuota.from_url(redis_url, limit, window=window, prefix=f"quota:{namespace}:")
+    raise ValueError(f"unknown rate limit backend: {backend!r}")
@@ -0,0 +1,65 @@
+# /backend/recent_entries.py
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class RecentEntries:
+    """Write-through ring buffer of the newest rows of one table.
+
+    The insert path appends the row it just committed (with its id), so
+    reading the "last N entries" never has to query the table per submit.
+    Call warm() once at startup.
+
+    The buffer only sees this process's inserts. When other processes
+    write the table too (gunicorn workers, other nodes, bulk imports), set
+    `refresh`: snapshot() then re-reads the newest rows at most once per
+    `refresh` seconds, so every process shows the same rows.
+    """
+
+    def __init__(self, table, columns, maxlen=10, refresh=0):
+        self.table = table
+        self.columns = tuple(columns)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rows = deque(maxlen=maxlen)  # oldest -> newest
+        self._storage = None
+        self._loaded_at = 0.0  # time.monotonic() of the last warm()
+
+    def append(self, row_id, values, created_at=None):
+        """Add a freshly committed row; `values` maps column name -> value."""
+        row = {column: values.get(column) for column in self.columns}
+        row["id"] = row_id
+        row["created_at"] = created_at or datetime.now().replace(microsecond=0)
+        with self._lock:
+            self._rows.append(row)
+
+    def stale(self):
+        """True when the next snapshot() will re-read the table."""
+        return bool(self.refresh) and self._storage is not None and time.monotonic() - self._loaded_at >= self.refresh
+
+    def snapshot(self):
+        """Newest-first copy of the buffered rows (re-read first when stale)."""
+        if self.stale() and self._refresh_lock.acquire(blocking=False):  # one reader; the others use the buffer
+            try:
+                self.warm(self._storage)
+            except Exception as e:
+                self._loaded_at = time.monotonic()  # try again after `refresh`, not on every request
+                print("❌ Recent Entries Refresh Error:", e)
+            finally:
+                self._refresh_lock.release()
+        with self._lock:
+            return [dict(row) for row in reversed(self._rows)]
+
+    def warm(self, storage):
+        """Fill the buffer from the table (newest rows by primary key)."""
+        self._storage = storage
+        rows = storage.recent(self.table, self.columns, self._rows.maxlen)
+        with self._lock:
+            self._rows.clear()
+            self._rows.extend(reversed(rows))
+            self._loaded_at = time.monotonic()
+        return len(rows)
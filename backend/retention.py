@@ -0,0 +1,183 @@
+# /backend/retention.py
+#
+# Rolling archive for contact_messages / service_requests. Rows older than
+# RETENTION_DAYS are written to gzip NDJSON files (one per table and month,
+# e.g. archive/contact_messages/2024-03.ndjson.gz) and then deleted, a small
+# batch per transaction so no lock is held for long.
+#
+# MySQL range partitioning on created_at is not an option here: every unique
+# key (the id primary key, uniq_content_hash) would have to include
+# created_at, which would break both the AUTO_INCREMENT key and duplicate
+# detection.
+#
+#   python -m backend.retention --once      # one pass, e.g. from cron
+
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class Archiver:
+    """Background thread moving expired rows to compressed NDJSON files.
+
+    Files are fsynced before the batch is deleted; a crash in between
+    re-archives that batch on the next pass (at-least-once, rows carry ids).
+    """
+
+    def __init__(self, get_connection, columns, retention_days, directory, batch_size=1000, interval=3600,
+                 pause=0.1, lock_name=None, forget=None):
+        self.get_connection = get_connection
+        self.columns = columns        # {table: columns to select}; content_hash is passed to forget, not archived
+        self.retention_days = retention_days
+        self.directory = directory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause            # seconds between batches (lets replication / other writers breathe)
+        self.lock_name = lock_name    # MySQL GET_LOCK name, so only one process archives at a time
+        self.forget = forget          # callable(table, row), e.g. drop the row's hash from memory
+        self._stop = threading.Event()
+        self._thread = None
+
+        # --- Stats ---
+        self.archived = {table: 0 for table in columns}
+        self.batches = 0
+        self.runs = 0
+        self.errors = 0
+        self.last_run = None
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._thread is not None or self.retention_days <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.errors += 1
+                print("❌ Retention Archiver Error:", e)
+            self._stop.wait(self.interval)
+
+    # --- Archiving ---
+    def run_once(self, now=None):
+        """Archive every expired row of every table; returns {table: rows archived}."""
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        moved = {}
+        with self.get_connection() as conn:
+            if not self._lock(conn):
+                return moved
+            try:
+                for table in self.columns:
+                    moved[table] = self._archive_table(conn, table, cutoff)
+            finally:
+                self._unlock(conn)
+        self.runs += 1
+        self.last_run = datetime.now().replace(microsecond=0)
+        if any(moved.values()):
+            print(f"✅ Archived {', '.join(f'{n} from {t}' for t, n in moved.items() if n)} (older than {cutoff:%Y-%m-%d}).")
+        return moved
+
+    def _archive_table(self, conn, table, cutoff):
+        columns = self.columns[table]
+        total = 0
+        while not self._stop.is_set():
+            cursor = conn.cursor(dictionary=True)
+            # (created_at, id) order walks idx_created; LIMIT keeps each transaction short.
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE created_at < %s "
+                f"ORDER BY created_at, id LIMIT %s",
+                (cutoff, self.batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                break
+            self._write(table, columns, rows)
+            ids = [row["id"] for row in rows]
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+            conn.commit()
+            cursor.close()
+            if self.forget:
+                for row in rows:
+                    self.forget(table, row)
+            total += len(rows)
+            self.archived[table] += len(rows)
+            self.batches += 1
+            if len(rows) < self.batch_size:
+                break
+            time.sleep(self.pause)
+        return total
+
+    def _write(self, table, columns, rows):
+        by_month = {}
+        for row in rows:
+            created = row["created_at"]
+            month = created.strftime("%Y-%m") if hasattr(created, "strftime") else str(created)[:7]
+            by_month.setdefault(month, []).append(row)
+        folder = os.path.join(self.directory, table)
+        os.makedirs(folder, exist_ok=True)
+        for month, month_rows in by_month.items():
+            # Appending a new gzip member per batch keeps the file a valid .gz stream.
+            with open(os.path.join(folder, f"{month}.ndjson.gz"), "ab") as f:
+                with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                    for row in month_rows:
+                        record = {column: row[column] for column in columns if column != "content_hash"}
+                        gz.write((json.dumps(record, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+    # --- Single-runner lock (MySQL named lock; skipped when lock_name is None) ---
+    def _lock(self, conn):
+        if not self.lock_name:
+            return True
+        cursor = conn.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (self.lock_name,))
+        acquired = cursor.fetchone()[0] == 1
+        cursor.close()
+        return acquired
+
+    def _unlock(self, conn):
+        if not self.lock_name:
+            return
+        cursor = conn.cursor()
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (self.lock_name,))
+        cursor.fetchall()
+        cursor.close()
+
+    def stats(self):
+        return {
+            "retention_days": self.retention_days,
+            "running": self._thread is not None,
+            "archived": dict(self.archived),
+            "batches": self.batches,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive rows older than RETENTION_DAYS.")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+    from . import core
+    if core.archiver.retention_days <= 0:
+        raise SystemExit("❌ RETENTION_DAYS is not set; nothing to archive.")
+    if args.once:
+        core.archiver.run_once()
+    else:
+        core.archiver._run()
@@ -0,0 +1,396 @@
+# /backend/routes.py
+
+import functools
+import hmac
+import time
+
+from flask import Blueprint, Response, g, request, jsonify, make_response, stream_with_context
+import mysql.connector
+
+from . import core, idempotency, metrics
+from .bulk import BulkError, insert_batches, parse_items, validate
+from .config import (
+    ADMIN_TOKEN, BULK_BATCH, BULK_MAX_BYTES, BULK_MAX_ITEMS, EXPORT_BATCH, INCLUDE_RECENT_ENTRIES, METRICS, PARTNER_KEYS, WRITE_BEHIND,
+    CONTACT_URL, SERVICE_URL, STATIC_DIR, STATIC_MAX_AGE,
+)
+from .core import CONTACT_TABLE, SERVICE_TABLE
+from .export import FORMATS, ExportError, export, parse_datetime
+from .forms import FormError, parse_contact, parse_service_request
+from .service_query import QueryError, parse_params, query
+from .static_pages import StaticPages
+from .timing import stage
+from .write_behind import QueueFull
+
+contact_bp = Blueprint("contact", __name__)
+service_bp = Blueprint("request_service", __name__)
+stats_bp = Blueprint("stats", __name__)
+admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
+pages_bp = Blueprint("pages", __name__)
+
+pages = StaticPages(
+    STATIC_DIR,
+    {"/": "index.html", "/index.html": "index.html", "/reqservice.html": "reqservice.html"},
+    {"contact-endpoint": CONTACT_URL, "service-endpoint": SERVICE_URL},
+)
+
+
+# --- Helpers ---
+def get_client_ip():
+    """Get real client IP (handles proxies)."""
+    if request.headers.get("X-Forwarded-For"):
+        return request.headers.get("X-Forwarded-For").split(",")[0].strip()
+    return request.remote_addr
+
+def wants_recent_entries():
+    return INCLUDE_RECENT_ENTRIES or request.args.get("recent") == "1"
+
+def error(message, status):
+    return jsonify({"status": "error", "message": message}), status
+
+def get_partner():
+    """Partner name for the request's API key (Authorization: Bearer or X-API-Key), else None."""
+    auth = request.headers.get("Authorization", "")
+    key = auth[7:] if auth.startswith("Bearer ") else request.headers.get("X-API-Key", "")
+    partner = None
+    for known, name in PARTNER_KEYS.items():
+        if key and hmac.compare_digest(key, known):
+            partner = name
+    return partner
+
+def body_too_large(e):
+    return error("Request body is too large.", 413)
+
+def is_admin():
+    """Bearer-token check for /admin/* (and partner stats); always False when ADMIN_TOKEN is unset."""
+    auth = request.headers.get("Authorization", "")
+    return bool(ADMIN_TOKEN) and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:], ADMIN_TOKEN)
+
+def spam_check(table, data, row):
+    """Error response from the first spam check that rejects the submission, else None."""
+    rejection = core.check_spam(table, get_client_ip(), data, row)
+    if rejection is not None:
+        return error(rejection.message, rejection.status)
+    return None
+
+def invalid(e):
+    """400 for a payload that failed schema validation (final: stored for its Idempotency-Key)."""
+    g.final = True
+    return error(e.message, 400)
+
+def in_progress():
+    return error("A request with this Idempotency-Key is already in progress.", 409)
+
+def storable(status):
+    return status == 200 or (status == 400 and g.get("final", False))
+
+def replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return error("This Idempotency-Key was already used with a different request.", 422)
+    g.outcome = "replayed"
+    return Response(stored.body, status=stored.status, mimetype="application/json",
+                    headers={"Idempotent-Replayed": "true"})
+
+def idempotent(view):
+    """Idempotency-Key support: a retry with a known key gets the stored first response back.
+
+    Only final answers (200, and 400 from invalid()) are stored; spam and MX
+    rejections, 429 and 5xx may be retried with the same key, as the result
+    can change (e.g. a DNS timeout). A key reused with a different body is
+    refused with 422, one still running in this worker with 409. A success
+    saves its key row in the insert transaction (save_submission); when
+    another worker saved the key first, that submission is rolled back and
+    the other worker's response is replayed.
+    """
+    @functools.wraps(view)
+    def wrapper():
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return view()
+        key = key.strip()
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return error("Invalid Idempotency-Key header.", 400)
+        key_digest = idempotency.digest(request.path, key)
+        request_hash = idempotency.fingerprint(request.get_data(cache=True))
+        # Claim before the lookup: a concurrent first request either still holds the claim or has saved.
+        if not core.idempotency.claim(key_digest):
+            return in_progress()
+        try:
+            with stage("idempotency"):
+                stored = core.idempotency.lookup(key_digest)
+            if stored is not None:
+                return replay(stored, request_hash)
+            g.idempotency_key = (key_digest, request_hash)
+            try:
+                response = make_response(view())
+            except idempotency.KeyTaken:
+                stored = core.idempotency.lookup(key_digest)
+                return in_progress() if stored is None else replay(stored, request_hash)
+            if storable(response.status_code) and not g.get("idempotency_saved", False):
+                core.idempotency.save(key_digest, request_hash, response.status_code, response.get_data())
+            return response
+        finally:
+            core.idempotency.release(key_digest)
+    return wrapper
+
+def duplicate():
+    g.outcome = "duplicate"
+    return jsonify({
+        "status": "duplicate",
+        "message": "⚠️ This message was already received earlier. Please wait for a response."
+    }), 200
+
+def save_submission(table, row, success_message, log_title):
+    """INSERT (or queue, in write-behind mode) one validated row and build the response.
+
+    With an Idempotency-Key, the key row is written along with the submission
+    (raises idempotency.KeyTaken when another request saved it first). The
+    stored response has no recent_entries, so a replay omits them.
+    """
+    if core.is_known_duplicate(table, row):
+        return duplicate()
+    response = {"status": "success", "message": success_message}
+    key = g.get("idempotency_key")
+    stored_body = jsonify(response).get_data() if key else None
+    if WRITE_BEHIND:
+        try:
+            with stage("insert"):
+                core.write_behind.submit(table, tuple(row), tuple(row.values()))
+                if key:
+                    # Queued behind the row: until the flush only claim() guards the key (per worker), and
+                    # an expired row not purged yet makes it a flush duplicate (kept in memory only).
+                    core.write_behind.submit(idempotency.KEYS_TABLE, idempotency.KEY_COLUMNS,
+                                             core.idempotency.row(*key, 200, stored_body))
+        except QueueFull:
+            return jsonify({"status": "error", "message": "⚠️ Server is busy. Please try again shortly."}), 503, {"Retry-After": "5"}
+        row_id = None
+    else:
+        enqueue = core.notifier.enqueue  # outbox rows in the same transaction
+        if key:
+            enqueue = core.idempotency.writer(*key, 200, stored_body, enqueue)
+        row_id = core.storage.insert(table, row, enqueue)
+        if row_id is None:
+            core.remember_content(table, row)
+            return duplicate()
+    if key:
+        if core.idempotency.remember(*key, 200, stored_body):
+            core.idempotency.purge()
+        g.idempotency_saved = True
+
+    core.record_submission(table, row_id, row)
+
+    # --- Logging: no field values (they are PII); alerts go through core.notifier ---
+    print(f"{log_title} #{row_id}" if row_id else f"{log_title} (queued)")
+
+    if wants_recent_entries():
+        with stage("recent"):
+            response["recent_entries"] = core.recent_entries[table].snapshot()
+    return jsonify(response), 200
+
+def handle_submission(table, row, success_message, log_title):
+    try:
+        return save_submission(table, row, success_message, log_title)
+    except idempotency.KeyTaken:
+        raise  # answered by idempotent()
+    except mysql.connector.Error as e:
+        print("❌ Database Error:", e)
+        return error("Database connection or query failed.", 500)
+    except Exception as e:
+        print("❌ Unexpected Error:", e)
+        return error("Server error. Please try again later.", 500)
+
+
+# --- Metrics ---
+def start_timer():
+    g.started = time.perf_counter()
+
+def record_outcome(response):
+    if METRICS and "started" in g:
+        endpoint = request.path
+        metrics.request_seconds.labels(endpoint).observe(time.perf_counter() - g.started)
+        metrics.submissions.labels(endpoint, metrics.outcome(response.status_code, g.get("outcome"))).inc()
+    return response
+
+for bp in (contact_bp, service_bp):
+    bp.before_request(start_timer)
+    bp.after_request(record_outcome)
+
+
+# --- Routes ---
+@contact_bp.route("/contact", methods=["POST"])
+@idempotent
+def contact():
+    data = request.get_json(silent=True)
+    try:
+        with stage("validation"):
+            row = parse_contact(data)
+    except FormError as e:
+        return invalid(e)
+
+    # --- Spam checks (honeypot ... MX lookup, cheapest first) ---
+    rejected = spam_check(CONTACT_TABLE, data, row)
+    if rejected:
+        return rejected
+
+    return handle_submission(CONTACT_TABLE, row, "✅ Message submitted successfully.", "📩 New Message Received")
+
+@service_bp.route("/request-service", methods=["POST"])
+@idempotent
+def request_service():
+    data = request.get_json(silent=True)
+    try:
+        with stage("validation"):
+            row = parse_service_request(data)
+    except FormError as e:
+        return invalid(e)
+
+    # --- Spam checks ---
+    rejected = spam_check(SERVICE_TABLE, data, row)
+    if rejected:
+        return rejected
+
+    return handle_submission(SERVICE_TABLE, row, "✅ Service request submitted successfully.", "📩 New Service Request")
+
+@service_bp.route("/request-service/bulk", methods=["POST"])
+def request_service_bulk():
+    """Partner import: NDJSON or a JSON array of service requests, one result per item."""
+    partner = get_partner()
+    if partner is None:
+        return error("A valid partner API key is required.", 401)
+    request.max_content_length = BULK_MAX_BYTES  # before the body is read
+    try:
+        with stage("validation"):
+            items = parse_items(request.get_data(), request.content_type or "", BULK_MAX_ITEMS)
+            rows, results = validate(items)
+    except BulkError as e:
+        return error(e.message, e.status)
+
+    # --- Partner quota (instead of the per-IP limit and email cooldown) ---
+    ok, remaining, reset_in = core.partner_quota.take(partner, len(rows))
+    if not ok:
+        message = f"⚠️ Import quota exceeded: {remaining} items left in this hour."
+        return jsonify({"status": "error", "message": message}), 429, {"Retry-After": str(int(reset_in) + 1)}
+
+    accepted, db_failed = 0, False
+    pending = dict(rows)
+    try:
+        with stage("insert"):
+            for batch, exc in insert_batches(core.get_db_connection, SERVICE_TABLE, rows, BULK_BATCH,
+                                             enqueue=core.notifier.enqueue):
+                if exc is not None:
+                    print("❌ Database Error:", exc)
+                    db_failed = True
+                for index, row in batch:
+                    del pending[index]
+                    if exc is not None:
+                        results[index] = {"index": index, "status": "error", "message": "Database connection or query failed."}
+                        continue
+                    results[index] = {"index": index, "status": "success"}
+                    core.record_submission(SERVICE_TABLE, None, row)
+                    accepted += 1
+    except Exception as e:
+        print("❌ Database Error:", e)
+        db_failed = True
+    for index in pending:
+        results[index] = {"index": index, "status": "error", "message": "Database connection or query failed."}
+    if accepted < len(rows):
+        # Items that were not stored do not count against the quota.
+        core.partner_quota.refund(partner, len(rows) - accepted)
+        remaining += len(rows) - accepted
+
+    print(f"📩 Bulk import from {partner}: {accepted} accepted, {len(items) - accepted} rejected.")
+    status = "success" if accepted == len(items) else "partial" if accepted else "error"
+    return jsonify({
+        "status": status,
+        "accepted": accepted,
+        "rejected": len(items) - accepted,
+        "quota_remaining": remaining,
+        "results": [results[index] for index in range(len(items))],
+    }), 500 if status == "error" and db_failed else 200
+
+@pages_bp.route("/", methods=["GET"])
+@pages_bp.route("/index.html", methods=["GET"])
+@pages_bp.route("/reqservice.html", methods=["GET"])
+def static_page():
+    """Form page from memory: best precompressed variant, ETag revalidation (304)."""
+    page = pages.get(request.path)
+    if page is None:
+        return error("Page not found.", 404)
+    encoding, body, etag = page.variant(request.accept_encodings)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={STATIC_MAX_AGE}" if STATIC_MAX_AGE else "no-cache",
+    }
+    if request.if_none_match.contains_weak(etag.strip('"')):
+        return Response(status=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, content_type=page.content_type, headers=headers)
+
+@stats_bp.route("/healthz", methods=["GET"])
+def healthz():
+    """Readiness for load balancers; answered from memory, never opens a DB connection."""
+    ok, problems = core.health()
+    if not ok:
+        return jsonify({"status": "error", "message": "; ".join(problems)}), 503
+    return jsonify({"status": "ok"}), 200
+
+def visible_stats():
+    """core.stats(), without the per-partner quota usage unless the caller has ADMIN_TOKEN."""
+    stats = core.stats()
+    if not is_admin():
+        del stats["partner_quota"]
+    return stats
+
+@stats_bp.route("/stats", methods=["GET"])
+def all_stats():
+    return jsonify(visible_stats()), 200
+
+@stats_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@stats_bp.route("/stats/<component>", methods=["GET"])
+def component_stats(component):
+    stats = visible_stats()
+    key = component.replace("-", "_")
+    if key not in stats:
+        return error("Unknown stats component.", 404)
+    return jsonify(stats[key]), 200
+
+
+# --- Admin ---
+@admin_bp.before_request
+def require_admin():
+    if not is_admin():
+        return error("Admin access required.", 401)
+
+@admin_bp.route("/export/<table>", methods=["GET"])
+def export_table(table):
+    """Stream a table as CSV or NDJSON: ?format=&since=&until=&service=&after_id="""
+    fmt = request.args.get("format", "ndjson")
+    try:
+        chunks = export(
+            core.storage, table, fmt,
+            since=parse_datetime(request.args.get("since"), "since"),
+            until=parse_datetime(request.args.get("until"), "until"),
+            service=request.args.get("service") or None,
+            after_id=request.args.get("after_id", 0, type=int),
+            batch_size=EXPORT_BATCH,
+        )
+    except ExportError as e:
+        return error(e.message, 400)
+    headers = {"Content-Disposition": f'attachment; filename="{table}.{fmt}"'}
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt], headers=headers)
+
+@admin_bp.route("/service-requests", methods=["GET"])
+def list_service_requests():
+    """Filtered page of service requests; pass next_cursor back as ?cursor= for the next page."""
+    try:
+        rows, next_cursor = query(core.get_db_connection, **parse_params(request.args))
+    except QueryError as e:
+        return error(e.message, 400)
+    except mysql.connector.Error as e:
+        print("❌ Database Error:", e)
+        return error("Database connection or query failed.", 500)
+    return jsonify({"status": "success", "items": rows, "next_cursor": next_cursor}), 200
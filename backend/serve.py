@@ -0,0 +1,132 @@
+# /backend/serve.py
+#
+# Production launcher: gunicorn with threaded (gthread) pre-forked workers.
+# The app is imported once in the master (preload), the schema is checked
+# there, and every worker then resets the inherited connection pool, claims
+# its own write-behind journal and starts its background threads. /metrics
+# sums the snapshots every worker writes to METRICS_DIR. On SIGTERM workers
+# finish in-flight requests, flush the write-behind queue and close their
+# connections before exiting.
+#
+#   python app.py                               # same as below, PORT=5000
+#   python -m backend.serve app:app --port 5000
+#   gunicorn app:app                            # picks up ./gunicorn.conf.py
+
+import argparse
+import fcntl
+import os
+import shutil
+import tempfile
+
+from .config import (
+    WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WRITE_BEHIND, WRITE_BEHIND_JOURNAL, DB_POOL_MAX, STORAGE,
+    METRICS_DIR,
+)
+
+
+def cpu_count():
+    """CPUs this process may run on (respects affinity / cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# --- Settings (module-level names are read by gunicorn from a config file) ---
+workers = WEB_WORKERS or 2 * cpu_count() + 1
+threads = WEB_THREADS
+worker_class = "gthread"
+preload_app = True
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+keepalive = 5
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+
+# --- Hooks ---
+def on_starting(server):
+    """Master, before forking: schema check (one SELECT), then drop the connection it used."""
+    from . import core, metrics
+    core.storage.check()
+    core.storage.close()
+    metrics.use_directory(METRICS_DIR or tempfile.mkdtemp(prefix="form-metrics-"), clear=True)
+    server.metrics_tmp = not METRICS_DIR
+    if STORAGE == "sqlite":
+        backing = f"SQLite {core.storage.path}, one writer thread per worker"
+    else:
+        backing = f"up to {server.cfg.workers * DB_POOL_MAX} MySQL connections"
+    print(f"✅ Starting {server.cfg.workers} workers x {server.cfg.threads} threads ({backing}).")
+
+
+def _claim_journal(server, worker):
+    """Lock the first free per-slot journal, so a replacement worker replays what a dead one left."""
+    for slot in range(max(server.cfg.workers, 1) * 2):
+        path = f"{WRITE_BEHIND_JOURNAL}.{slot}"
+        handle = open(path + ".lock", "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        worker.journal_lock = handle  # held for the worker's lifetime
+        return path
+    raise RuntimeError("no free write-behind journal slot")
+
+
+def post_fork(server, worker):
+    """Worker: fresh pool / SQLite state (connections are never shared across processes), then warm up."""
+    from . import core, metrics
+    core.storage.reset()
+    if WRITE_BEHIND:
+        core.write_behind.use_journal(_claim_journal(server, worker))
+    core.warm(start_write_behind=True)
+    metrics.start_sharing()
+
+
+def worker_exit(server, worker):
+    """Worker shutdown, after in-flight requests finished: drain queues, close connections."""
+    from . import core, metrics
+    core.write_behind.stop(timeout=server.cfg.graceful_timeout)
+    core.notifier.stop()
+    core.archiver.stop()
+    core.storage.close()  # SQLite: commits what the writer still has queued
+    metrics.stop_sharing()
+
+
+def on_exit(server):
+    """Master, after the workers exited: remove the metrics snapshot dir if it was a temp one."""
+    from . import metrics
+    if getattr(server, "metrics_tmp", False):
+        shutil.rmtree(metrics.directory(), ignore_errors=True)
+
+
+# --- Launcher ---
+def run(app_uri, port=None):
+    """Serve `app_uri` ("module:app") with the settings above."""
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.util import import_app
+
+    settings = {
+        "workers": workers, "threads": threads, "worker_class": worker_class, "preload_app": preload_app,
+        "timeout": timeout, "graceful_timeout": graceful_timeout, "keepalive": keepalive,
+        "bind": f"0.0.0.0:{port}" if port else bind,
+        "on_starting": on_starting, "post_fork": post_fork, "worker_exit": worker_exit, "on_exit": on_exit,
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for name, value in settings.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            return import_app(app_uri)
+
+    Server().run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a form app under gunicorn.")
+    parser.add_argument("app", nargs="?", default="app:app", help="module:variable (default app:app)")
+    parser.add_argument("--port", type=int, help="default: PORT or 5000")
+    args = parser.parse_args()
+    run(args.app, args.port)
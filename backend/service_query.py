@@ -0,0 +1,152 @@
+# /backend/service_query.py
+#
+# Filtered, sorted, keyset-paginated reads over service_requests for the
+# triage dashboard. A page is fetched with a deferred join: the inner query
+# selects only ids, so it can be answered from one of db_schema.SERVICE_INDEXES
+# alone, and only the page's rows are then read from the clustered index.
+
+import base64
+import json
+from datetime import date, datetime
+
+from .core import SERVICE_TABLE
+from .export import EXPORT_COLUMNS, ExportError, parse_datetime
+
+SORT_COLUMNS = ("created_at", "priority", "deadline", "budget")
+NULLABLE = ("deadline", "budget")  # sorting by these lists only rows that have a value
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class QueryError(Exception):
+    """Invalid filter, sort or cursor."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+# --- Cursor (opaque to clients: last row's sort value + id) ---
+def encode_cursor(value, row_id):
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise QueryError("Invalid cursor.")
+
+
+# --- Parameters ---
+def _int(args, name, low=None, high=None):
+    value = args.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be a number.")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise QueryError(f"{name} must be between {low} and {high}.")
+    return value
+
+
+def _date(args, name):
+    try:
+        return parse_datetime(args.get(name), name)
+    except ExportError as e:
+        raise QueryError(e.message)
+
+
+def parse_params(args):
+    """Query-string arguments (a werkzeug MultiDict or plain dict) -> query() keyword arguments."""
+    getlist = getattr(args, "getlist", lambda name: [args[name]] if args.get(name) else [])
+    sort = args.get("sort", "-created_at")
+    descending = sort.startswith("-")
+    if sort.lstrip("-") not in SORT_COLUMNS:
+        raise QueryError(f"sort must be one of: {', '.join(SORT_COLUMNS)} (prefix - for descending).")
+    return {
+        "services": [s for s in getlist("service") if s],
+        "priority_min": _int(args, "priority_min", 1, 5),
+        "priority_max": _int(args, "priority_max", 1, 5),
+        "budget_min": _int(args, "budget_min"),
+        "budget_max": _int(args, "budget_max"),
+        "deadline_from": _date(args, "deadline_from"),
+        "deadline_to": _date(args, "deadline_to"),
+        "since": _date(args, "since"),
+        "until": _date(args, "until"),
+        "sort": sort.lstrip("-"),
+        "descending": descending,
+        "limit": _int(args, "limit", 1, MAX_LIMIT) or DEFAULT_LIMIT,
+        "cursor": decode_cursor(args["cursor"]) if args.get("cursor") else None,
+    }
+
+
+# --- Query ---
+def build_query(services=(), priority_min=None, priority_max=None, budget_min=None, budget_max=None,
+                deadline_from=None, deadline_to=None, since=None, until=None,
+                sort="created_at", descending=True, limit=DEFAULT_LIMIT, cursor=None):
+    """SQL + params for one page (limit + 1 rows, to tell whether another page follows)."""
+    where, params = [], []
+
+    def add(condition, *values):
+        where.append(condition)
+        params.extend(values)
+
+    if services:
+        add(f"service IN ({', '.join(['%s'] * len(services))})", *services)
+    if priority_min is not None:
+        add("priority >= %s", priority_min)
+    if priority_max is not None:
+        add("priority <= %s", priority_max)
+    if budget_min is not None:
+        add("budget >= %s", budget_min)
+    if budget_max is not None:
+        add("budget <= %s", budget_max)
+    if deadline_from:
+        add("deadline >= %s", deadline_from.date())
+    if deadline_to:
+        add("deadline <= %s", deadline_to.date())
+    if since:
+        add("created_at >= %s", since)
+    if until:
+        add("created_at < %s", until)
+    if sort in NULLABLE:
+        add(f"{sort} IS NOT NULL")
+    if cursor is not None:
+        op = "<" if descending else ">"
+        value, row_id = cursor
+        add(f"({sort} {op} %s OR ({sort} = %s AND id {op} %s))", value, value, row_id)
+
+    direction = "DESC" if descending else "ASC"
+    columns = ", ".join(f"s.{column}" for column in EXPORT_COLUMNS[SERVICE_TABLE])
+    sql = (
+        f"SELECT {columns} FROM {SERVICE_TABLE} AS s JOIN ("
+        f"SELECT id FROM {SERVICE_TABLE}{' WHERE ' + ' AND '.join(where) if where else ''} "
+        f"ORDER BY {sort} {direction}, id {direction} LIMIT %s"
+        f") AS page ON page.id = s.id ORDER BY s.{sort} {direction}, s.id {direction}"
+    )
+    params.append(limit + 1)
+    return sql, tuple(params)
+
+
+def query(get_connection, **params):
+    """One page of service requests: (rows, next_cursor or None)."""
+    sql, args = build_query(**params)
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, args)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    limit = params.get("limit", DEFAULT_LIMIT)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    sort = params.get("sort", "created_at")
+    return rows, encode_cursor(rows[-1][sort], rows[-1]["id"])
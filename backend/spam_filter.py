@@ -0,0 +1,239 @@
+# /backend/spam_filter.py
+#
+# Ordered spam checks for the form endpoints. Every check carries a cost and
+# the pipeline runs them cheapest first, stopping at the first rejection, so
+# a bot flood is turned away by the honeypot, blocklists and in-memory
+# limiter before it reaches the resolver (MX) or MySQL (cooldown lookup).
+#
+#   cost 0   honeypot, email format       (a dict lookup / one regex)
+#   cost 1   IP blocklist, disposable domain   (radix trie / set lookups)
+#   cost 2   per-IP limiter               (in memory, or Redis/SQLite)
+#   cost 5   content heuristics           (regex scan of the text fields)
+#   cost 50  email cooldown               (may query MySQL)
+#   cost 100 MX lookup                    (may query DNS)
+
+import inspect
+import ipaddress
+import re
+import threading
+
+from .forms import email_format_ok, is_spam
+
+LINK_RE = re.compile(r"https?://|www\.|\[url[=\]]|<a\s", re.IGNORECASE)
+
+# A few well-known throwaway providers; extend with DISPOSABLE_DOMAINS_PATH.
+DISPOSABLE_DOMAINS = frozenset((
+    "10minutemail.com", "dispostable.com", "getnada.com", "guerrillamail.com", "mailinator.com",
+    "maildrop.cc", "sharklasers.com", "temp-mail.org", "tempmail.com", "throwawaymail.com",
+    "trashmail.com", "yopmail.com",
+))
+
+
+def read_list(path):
+    """Non-empty, non-comment lines of a text file (one entry per line)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+# --- Lookups ---
+class IPBlocklist:
+    """Binary radix trie of blocked IPv4 / IPv6 networks.
+
+    A lookup walks at most one node per prefix bit and stops at the first
+    blocked prefix, so the cost does not depend on the number of entries.
+    Nodes are [zero-child, one-child, blocked].
+    """
+
+    def __init__(self, networks=()):
+        self._roots = {4: [None, None, False], 6: [None, None, False]}
+        self.size = 0
+        for network in networks:
+            self.add(network)
+
+    def add(self, network):
+        """Block a network ("203.0.113.0/24", "2001:db8::/32") or a single address."""
+        net = ipaddress.ip_network(network, strict=False)
+        bits, node = int(net.network_address), self._roots[net.version]
+        for i in range(net.max_prefixlen - 1, net.max_prefixlen - 1 - net.prefixlen, -1):
+            bit = (bits >> i) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        if not node[2]:
+            node[2] = True
+            self.size += 1
+
+    def load(self, path):
+        for line in read_list(path):
+            self.add(line)
+        return self
+
+    def __contains__(self, ip):
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if addr.version == 6 and addr.ipv4_mapped:
+            addr = addr.ipv4_mapped
+        bits, node = int(addr), self._roots[addr.version]
+        for i in range(addr.max_prefixlen - 1, -1, -1):
+            if node[2]:
+                return True
+            node = node[(bits >> i) & 1]
+            if node is None:
+                return False
+        return node[2]
+
+    def __len__(self):
+        return self.size
+
+
+class DomainSet:
+    """Set of blocked email domains; subdomains of a listed domain match too."""
+
+    def __init__(self, domains=()):
+        self.domains = {domain.lower().strip(".") for domain in domains}
+
+    def load(self, path):
+        self.domains.update(domain.lower().strip(".") for domain in read_list(path))
+        return self
+
+    def __contains__(self, domain):
+        domain = domain.lower()
+        while True:
+            if domain in self.domains:
+                return True
+            _, dot, domain = domain.partition(".")
+            if not dot:
+                return False
+
+    def __len__(self):
+        return len(self.domains)
+
+
+# --- Pipeline ---
+class Submission:
+    """What the checks look at: the raw payload, the validated row and the client."""
+
+    __slots__ = ("table", "ip", "email", "domain", "data", "row")
+
+    def __init__(self, table, ip, data, row):
+        self.table = table
+        self.ip = ip
+        self.email = row["email"]
+        self.domain = self.email.rpartition("@")[2].lower()
+        self.data = data
+        self.row = row
+
+
+class Check:
+    """One pipeline stage; `test(submission)` returns True to pass (may be async under run_async)."""
+
+    __slots__ = ("name", "cost", "test", "status", "message")
+
+    def __init__(self, name, cost, test, status, message):
+        self.name = name
+        self.cost = cost
+        self.test = test
+        self.status = status
+        self.message = message
+
+
+class Rejection:
+    __slots__ = ("check", "status", "message")
+
+    def __init__(self, check):
+        self.check = check.name
+        self.status = check.status
+        self.message = check.message
+
+
+class SpamFilter:
+    """Runs checks in ascending cost order; the first failing check rejects the submission."""
+
+    def __init__(self, table, checks):
+        self.table = table
+        self.checks = sorted(checks, key=lambda check: check.cost)
+        self._lock = threading.Lock()
+
+        # --- Stats ---
+        self.runs = 0
+        self.reached = {check.name: 0 for check in self.checks}    # submissions the check ran on
+        self.rejected = {check.name: 0 for check in self.checks}
+
+    def _count(self, check, passed):
+        with self._lock:
+            self.reached[check.name] += 1
+            if not passed:
+                self.rejected[check.name] += 1
+
+    def run(self, submission):
+        """None if every check passed, else the Rejection of the first one that failed."""
+        with self._lock:
+            self.runs += 1
+        for check in self.checks:
+            passed = check.test(submission)
+            self._count(check, passed)
+            if not passed:
+                return Rejection(check)
+        return None
+
+    async def run_async(self, submission):
+        """Like run(), awaiting checks whose test is a coroutine function."""
+        with self._lock:
+            self.runs += 1
+        for check in self.checks:
+            passed = check.test(submission)
+            if inspect.isawaitable(passed):
+                passed = await passed
+            self._count(check, passed)
+            if not passed:
+                return Rejection(check)
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "table": self.table,
+                "runs": self.runs,
+                "checks": [
+                    {"name": c.name, "cost": c.cost, "reached": self.reached[c.name], "rejected": self.rejected[c.name]}
+                    for c in self.checks
+                ],
+            }
+
+
+def content_check(fields, max_links, link_free=("name",)):
+    """Too many links across `fields`, or any link in `link_free` fields (bots put URLs in the name)."""
+    def test(submission):
+        links = 0
+        for field in fields:
+            value = submission.row.get(field)
+            if not value:
+                continue
+            found = len(LINK_RE.findall(value))
+            if found and field in link_free:
+                return False
+            links += found
+        return links <= max_links
+    return test
+
+
+def build_filter(table, text_fields, blocklist, disposable, max_links, ip_allowed, cooldown_ok,
+                 has_mx=None, cooldown_message=""):
+    """The standard pipeline; `has_mx` (and the email format check) only when the endpoint verifies MX."""
+    checks = [
+        Check("honeypot", 0, lambda s: not is_spam(s.data), 400, "Spam detected."),
+        Check("ip_blocklist", 1, lambda s: s.ip not in blocklist, 403,
+              "⚠️ Submissions from your network are not accepted."),
+        Check("disposable_domain", 1, lambda s: s.domain not in disposable, 400,
+              "Please use a permanent email address."),
+        Check("rate_limit", 2, ip_allowed, 429, "⚠️ Too many requests from your IP. Please try again later."),
+        Check("content", 5, content_check(text_fields, max_links), 400, "Spam detected."),
+        Check("cooldown", 50, cooldown_ok, 429, cooldown_message),
+    ]
+    if has_mx is not None:
+        checks.append(Check("email_format", 0, lambda s: email_format_ok(s.email), 400,
+                            "Invalid or non-existent email address."))
+        checks.append(Check("mx", 100, has_mx, 400, "Invalid or non-existent email address."))
+    return SpamFilter(table, checks)
@@ -0,0 +1,83 @@
+# /backend/static_pages.py
+#
+# In-memory delivery of the form pages (index.html, reqservice.html) from the
+# app itself, so the forms post same-origin (no CORS preflight per submit).
+# Each page is read once, its endpoint <meta> tags are filled in from config,
+# and it is precompressed (gzip, and brotli when the `brotli` package is
+# installed). Requests get the best encoding the client accepts, a strong
+# ETag per variant and a 304 on revalidation.
+
+import gzip
+import hashlib
+import html
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+META_RE = re.compile(r'(<meta name="([\w-]+)" content=")[^"]*(">)')
+
+
+class Page:
+    """One page: {encoding: (body, etag)} for identity, gzip and (optionally) br."""
+
+    __slots__ = ("name", "content_type", "variants")
+
+    def __init__(self, name, body, content_type="text/html; charset=utf-8"):
+        self.name = name
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.variants = {"identity": (body, f'"{digest}"')}
+        self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    def variant(self, accept_encodings):
+        """(encoding, body, etag) for werkzeug's parsed Accept-Encoding header; br > gzip > identity."""
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return (encoding,) + self.variants[encoding]
+        return ("identity",) + self.variants["identity"]
+
+
+class StaticPages:
+    """Pages by URL path, loaded from `directory` on load() (idempotent)."""
+
+    def __init__(self, directory, routes, meta=None):
+        self.directory = directory
+        self.routes = routes    # {url path: file name}
+        self.meta = meta or {}  # {<meta name>: content}, e.g. {"contact-endpoint": "/contact"}
+        self.pages = {}
+
+    def render(self, text):
+        """Fill in the configured <meta> values (endpoint URLs)."""
+        def replace(match):
+            if match[2] not in self.meta:
+                return match[0]
+            return f"{match[1]}{html.escape(self.meta[match[2]], quote=True)}{match[3]}"
+        return META_RE.sub(replace, text)
+
+    def load(self):
+        if self.pages:
+            return self
+        loaded = {}
+        for name in set(self.routes.values()):
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    loaded[name] = Page(name, self.render(f.read()).encode("utf-8"))
+            except OSError as e:
+                print(f"❌ Static Page Error ({name}):", e)
+        self.pages = {path: loaded[name] for path, name in self.routes.items() if name in loaded}
+        return self
+
+    def get(self, path):
+        return self.pages.get(path)
+
+    def stats(self):
+        return {
+            path: {encoding: len(body) for encoding, (body, _) in page.variants.items()}
+            for path, page in self.pages.items()
+        }
@@ -0,0 +1,532 @@
+# /backend/storage.py
+#
+# Storage engines for the submission path: insert, the cooldown lookup
+# (last submission per email), the recent-entries query and export reads.
+#
+#   STORAGE=mysql    MySQL through the shared ConnectionPool (default)
+#   STORAGE=sqlite   one embedded database file (SQLITE_PATH) in WAL mode, no
+#                    server; for single-node deployments, CI and benchmarks
+#
+# Both hand out connections with mysql.connector semantics (%s placeholders,
+# cursor(dictionary=True), commit/rollback, mysql.connector errors with
+# errno 1062 on duplicates), so the other components (notification outbox,
+# idempotency keys, write-behind, bulk, retention, dashboard query) run
+# unchanged on either engine through core.get_db_connection().
+#
+# SQLite allows one writer at a time, so submissions are not inserted by the
+# request threads: they are queued to a single writer thread per process,
+# which commits whatever has queued up in one transaction (one fsync per
+# batch, not per row). Readers use WAL snapshots and never wait for it.
+
+import abc
+import fcntl
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import date, datetime
+
+import mysql.connector
+
+from .db_schema import SQLITE_SCHEMA
+from .timing import stage
+
+_PLACEHOLDER = re.compile(r"%s")
+_INSERT_IGNORE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.IGNORECASE)
+_UNSAFE = re.compile(r"[^\w.-]")
+
+# Stored as ISO text; TIMESTAMP / DATETIME / DATE columns come back as datetime / date.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("DATETIME", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+
+
+def insert_sql(table, row):
+    return f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join(['%s'] * len(row))})"
+
+
+class Storage(abc.ABC):
+    """Interface of a storage engine; the read path is shared portable SQL over self.connection().
+
+    An engine must implement every abstract method (it cannot be constructed otherwise).
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def connection(self):
+        """A connection with mysql.connector semantics; closing it returns / releases it."""
+
+    @abc.abstractmethod
+    def insert(self, table, row, enqueue=None):
+        """INSERT one row, with `enqueue(cursor, table, [row], [id])` in the same transaction.
+
+        Returns the new id, or None if the row hit a unique key (duplicate).
+        """
+
+    @abc.abstractmethod
+    def submit(self, table, row, enqueue=None):
+        """As insert(), but returns a concurrent.futures.Future of the result."""
+
+    @abc.abstractmethod
+    def check(self):
+        """True when the schema is current."""
+
+    @abc.abstractmethod
+    def warm(self):
+        """Open connections ahead of the first request."""
+
+    @abc.abstractmethod
+    def reset(self):
+        """Forget connections and threads inherited over fork (call in the child)."""
+
+    @abc.abstractmethod
+    def close(self):
+        """Release connections (and flush pending writes) at shutdown."""
+
+    @abc.abstractmethod
+    def stats(self):
+        """Snapshot of engine counters for monitoring."""
+
+    def select(self, sql, params=()):
+        """All rows of a query, as dicts."""
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+        return rows
+
+    def last_submission(self, table, email):
+        """created_at of the newest row from `email` (datetime), or None."""
+        rows = self.select(f"SELECT MAX(created_at) AS last_at FROM {table} WHERE email = %s", (email,))
+        return rows[0]["last_at"] if rows else None
+
+    def last_submissions(self, table, since):
+        """[{email, last_at}] for every address with a row since `since`, oldest first."""
+        return self.select(f"""
+            SELECT email, MAX(created_at) AS last_at FROM {table}
+            WHERE created_at >= %s GROUP BY email ORDER BY last_at
+        """, (since,))
+
+    def recent(self, table, columns, limit):
+        """The newest `limit` rows (id, columns..., created_at), newest first."""
+        selected = ", ".join(("id",) + tuple(columns) + ("created_at",))
+        return self.select(f"SELECT {selected} FROM {table} ORDER BY id DESC LIMIT %s", (limit,))
+
+
+# --- MySQL ---
+class MySQLStorage(Storage):
+    """MySQL through a ConnectionPool; each insert is its own short transaction."""
+
+    name = "mysql"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def connection(self):
+        return self.pool.acquire()
+
+    def insert(self, table, row, enqueue=None):
+        with stage("connect"):
+            conn = self.pool.acquire()
+        with conn:
+            cursor = conn.cursor()
+            try:
+                with stage("insert"):
+                    cursor.execute(insert_sql(table, row), tuple(row.values()))
+                    row_id = cursor.lastrowid
+                    if enqueue is not None:
+                        enqueue(cursor, table, [row], [row_id])
+                    conn.commit()
+            except mysql.connector.Error as e:
+                if e.errno != 1062:  # Duplicate entry
+                    raise
+                return None
+            finally:
+                cursor.close()
+        return row_id
+
+    def submit(self, table, row, enqueue=None):
+        """insert() in the calling thread; the returned Future is already resolved."""
+        future = Future()
+        try:
+            future.set_result(self.insert(table, row, enqueue))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    # --- Lifecycle ---
+    def check(self):
+        from . import migrations
+        return migrations.check(self.connection)
+
+    def warm(self):
+        self.pool.warm()
+
+    def reset(self):
+        self.pool.reset()
+
+    def close(self):
+        self.pool.close_all()
+
+    def stats(self):
+        return {"engine": self.name}
+
+
+# --- SQLite (mysql.connector-style connections) ---
+def translate(sql):
+    """MySQL dialect used by the backend -> SQLite."""
+    return _INSERT_IGNORE.sub("INSERT OR IGNORE", _PLACEHOLDER.sub("?", sql))
+
+
+def _convert(name, value):
+    # Aggregates (MAX(created_at) AS last_at) have no declared type and come back as text.
+    if isinstance(value, str) and name.endswith("_at"):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _error(e):
+    if isinstance(e, sqlite3.IntegrityError):
+        errno = 1062 if "UNIQUE" in str(e) else 1048
+        return mysql.connector.IntegrityError(msg=str(e), errno=errno)
+    return mysql.connector.DatabaseError(msg=str(e))
+
+
+class NamedLocks:
+    """GET_LOCK / RELEASE_LOCK for SQLite: flock on <database>.<name>.lock, so they hold across processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._held = {}  # {name: open lock file}
+
+    def get(self, name, timeout):
+        handle = open(f"{self.path}.{_UNSAFE.sub('_', name)}.lock", "w")
+        deadline = time.monotonic() + max(timeout or 0, 0)
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    handle.close()
+                    return 0
+                time.sleep(0.05)
+        with self._lock:
+            self._held[name] = handle
+        return 1
+
+    def release(self, name):
+        with self._lock:
+            handle = self._held.pop(name, None)
+        if handle is None:
+            return None
+        handle.close()
+        return 1
+
+
+def connect_sqlite(path, busy_timeout=30.0, synchronous="NORMAL", isolation_level="", locks=None):
+    """sqlite3 connection in WAL mode with declared-type conversion (and GET_LOCK / RELEASE_LOCK)."""
+    conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=isolation_level,
+                           detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    locks = locks or NamedLocks(path)
+    conn.create_function("GET_LOCK", 2, locks.get)
+    conn.create_function("RELEASE_LOCK", 1, locks.release)
+    return conn
+
+
+class SQLiteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(translate(sql), params)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._cursor.executemany(translate(sql), seq_params)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def _row(self, row):
+        if row is None:
+            return None
+        names = [d[0] for d in self._cursor.description]
+        values = [_convert(name, value) for name, value in zip(names, row)]
+        return dict(zip(names, values)) if self._dictionary else tuple(values)
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql.connector-style wrapper; with `shared`, close() only ends the transaction."""
+
+    def __init__(self, conn, shared=False):
+        self._conn = conn
+        self._shared = shared
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._conn, dictionary)
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._conn.execute("SELECT 1")
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        if self._shared:
+            self._conn.rollback()
+        else:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- SQLite ---
+class SQLiteStorage(Storage):
+    """Embedded SQLite database: WAL mode, one batching writer thread per process.
+
+    The schema is created on open (there is no migration step). Reads use one
+    connection per thread. insert() queues the row and waits for the writer,
+    which commits up to `batch_size` queued rows per transaction, each in its
+    own SAVEPOINT so a duplicate or failing row does not affect the others.
+    Several processes may open the same file; their writers take turns on
+    SQLite's write lock (`busy_timeout`).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, batch_size=256, synchronous="FULL", busy_timeout=30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.synchronous = synchronous  # FULL: a committed row survives power loss; NORMAL: process crashes only
+        self.busy_timeout = busy_timeout
+        self.locks = NamedLocks(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.close()
+        self._init_state()
+
+    def _init_state(self):
+        self._local = threading.local()
+        self._connections = []  # reader connections, closed by close()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._queue = deque()  # [(table, row, enqueue, future)]
+        self._thread = None
+        self._stopping = False
+
+        # --- Stats ---
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.max_batch = 0
+        self.commit_seconds = 0.0
+        self.errors = 0
+
+    def _connect(self, isolation_level=""):
+        return connect_sqlite(self.path, self.busy_timeout, self.synchronous, isolation_level, self.locks)
+
+    def connection(self):
+        """This thread's connection (reopened after fork); close() ends its transaction, not the connection."""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = self._connect()
+            local.pid = os.getpid()
+            with self._lock:
+                self._connections.append(local.conn)
+        return SQLiteConnection(local.conn, shared=True)
+
+    # --- Writer ---
+    def submit(self, table, row, enqueue=None):
+        """Queue one row for the writer thread; the Future resolves to its id (None: duplicate)."""
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+            self._queue.append((table, row, enqueue, future))
+            self._not_empty.notify()
+        return future
+
+    def insert(self, table, row, enqueue=None):
+        """INSERT one row (and its outbox rows) through the writer; the new id, or None if duplicate."""
+        with stage("insert"):
+            return self.submit(table, row, enqueue).result(timeout=self.busy_timeout * 2)
+
+    def _run(self):
+        conn = self._connect(isolation_level=None)  # explicit BEGIN / COMMIT
+        try:
+            while True:
+                with self._lock:
+                    while not self._queue and not self._stopping:
+                        self._not_empty.wait()
+                    if not self._queue:
+                        return
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        cursor = SQLiteCursor(conn)
+        results = []
+        started = time.perf_counter()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for table, row, enqueue, future in batch:
+                cursor.execute("SAVEPOINT submission")
+                try:
+                    cursor.execute(insert_sql(table, row), tuple(row.values()))
+                    row_id = cursor.lastrowid
+                    if enqueue is not None:
+                        enqueue(cursor, table, [row], [row_id])
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO submission")
+                    duplicate = isinstance(e, mysql.connector.Error) and e.errno == 1062
+                    results.append((future, None, None if duplicate else e))
+                else:
+                    results.append((future, row_id, None))
+                cursor.execute("RELEASE submission")
+            cursor.execute("COMMIT")
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            error = e if isinstance(e, mysql.connector.Error) else _error(e)
+            with self._lock:
+                self.errors += 1
+                self.failed += len(batch)
+            print("❌ SQLite Write Error:", e)
+            for _, _, _, future in batch:
+                future.set_exception(error)
+            return
+        finally:
+            cursor.close()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.batched_rows += len(batch)
+            self.max_batch = max(self.max_batch, len(batch))
+            self.commit_seconds += elapsed
+            for _, row_id, error in results:
+                if error is not None:
+                    self.failed += 1
+                elif row_id is None:
+                    self.duplicates += 1
+                else:
+                    self.inserted += 1
+        for future, row_id, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(row_id)
+
+    # --- Lifecycle ---
+    def check(self):
+        """The schema is created on open, so it is always current."""
+        from . import migrations
+        migrations.last_check = True
+        return True
+
+    def warm(self):
+        self.connection()
+
+    def reset(self):
+        """Forget threads and connections inherited over fork (they must not be used in the child)."""
+        self._inherited = self._connections  # kept referenced, never closed here
+        self._init_state()
+
+    def close(self, timeout=10.0):
+        """Commit what is queued, stop the writer and close the reader connections."""
+        with self._lock:
+            thread, self._stopping = self._thread, True
+            self._not_empty.notify()
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            self._thread = None
+            connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "engine": self.name,
+                "path": self.path,
+                "queue_depth": len(self._queue),
+                "inserted": self.inserted,
+                "duplicates": self.duplicates,
+                "failed": self.failed,
+                "batches": self.batches,
+                "avg_batch": round(self.batched_rows / self.batches, 2) if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "avg_commit_seconds": round(self.commit_seconds / self.batches, 6) if self.batches else 0.0,
+                "errors": self.errors,
+            }
+
+
+def make_storage(engine, pool=None, sqlite_path=None, batch_size=256, synchronous="FULL"):
+    """Build the storage selected by `engine`: "mysql" (over `pool`) or "sqlite"."""
+    if engine == "mysql":
+        return MySQLStorage(pool)
+    if engine == "sqlite":
+        return SQLiteStorage(sqlite_path, batch_size=batch_size, synchronous=synchronous)
+    raise ValueError(f"unknown storage engine: {engine!r}")
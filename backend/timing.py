@@ -0,0 +1,35 @@
+# /backend/timing.py
+#
+# Hot-path stage timing. Request handlers wrap each stage in `with stage(name)`;
+# every registered observer is called with (name, seconds). With no observers
+# registered a stage costs two perf_counter() calls.
+
+import time
+from contextlib import contextmanager
+
+observers = []  # callables (stage_name, seconds)
+
+
+def add_observer(callback):
+    if callback not in observers:
+        observers.append(callback)
+
+
+def remove_observer(callback):
+    if callback in observers:
+        observers.remove(callback)
+
+
+def observe(name, seconds):
+    for callback in observers:
+        callback(name, seconds)
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if observers:
+            observe(name, time.perf_counter() - started)
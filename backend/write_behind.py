@@ -0,0 +1,344 @@
+# /backend/write_behind.py
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+
+# Errors caused by the row's own values: only that INSERT is rolled back, and
+# retrying cannot help. Anything else (connection lost, deadlock, lock wait)
+# fails the whole batch, which is retried.
+ROW_ERRORS = {
+    1048,  # column cannot be null
+    1264,  # out of range value
+    1265,  # data truncated
+    1292,  # incorrect date / datetime value
+    1366,  # incorrect string / integer value
+    1406,  # data too long for column
+    1452,  # foreign key constraint fails
+    3819,  # check constraint violated
+}
+DUPLICATE = 1062
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the write-behind queue is at capacity."""
+
+
+# --- Journal encoding (JSON has no bytes; content_hash is BINARY(16)) ---
+def _encode(value):
+    if isinstance(value, bytes):
+        return {"hex": value.hex()}
+    return str(value)
+
+def _decode(value):
+    if isinstance(value, dict) and "hex" in value:
+        return bytes.fromhex(value["hex"])
+    return value
+
+
+
+class WriteBehindQueue:
+    """Durable write-behind buffer for form submissions.
+
+    submit() appends the row to a local NDJSON journal and returns; a
+    background thread drains the queue into MySQL in one transaction per
+    batch, batched by size (`batch_size`) and time (`flush_interval`). The
+    sequence number of the last committed row is kept in `<journal>.ckpt`,
+    so rows still in the journal after a crash are replayed by start().
+    Delivery is at-least-once: a crash between commit and checkpoint replays
+    that batch. Each process needs its own journal.
+
+    Each row is its own INSERT inside the batch transaction, so a failing
+    row only rolls back itself: a duplicate (unique key) is skipped and
+    counted, a row MySQL rejects for its values (ROW_ERRORS) is appended to
+    `<journal>.dead` with the error, and the rest of the batch commits. A
+    bad row therefore never blocks the queue.
+
+    submit() never touches MySQL, so the client is acknowledged before a
+    duplicate can be detected: only the in-memory hash filter
+    (core.is_known_duplicate) answers "duplicate" up front; any other
+    duplicate is acknowledged as success and dropped (and counted) at
+    flush time.
+
+    `enqueue(cursor, table, rows, ids)` is called in each flush transaction
+    with the rows that were inserted, as dicts, and their ids (notification
+    outbox); `on_commit(table, rows, ids)` with the same after the commit.
+    """
+
+    def __init__(self, get_connection, journal_path, max_depth=10000, batch_size=500,
+                 flush_interval=0.5, fsync=True, retry_delay=2.0, enqueue=None, on_commit=None):
+        self.get_connection = get_connection
+        self.enqueue = enqueue
+        self.on_commit = on_commit
+        self.journal_path = journal_path
+        self.checkpoint_path = journal_path + ".ckpt"
+        self.dead_letter_path = journal_path + ".dead"
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.retry_delay = retry_delay
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._queue = deque()  # [(seq, table, columns, values)]
+        self._seq = 0
+        self._committed = 0
+        self._sync_lock = threading.Lock()  # held by the thread running the journal fsync
+        self._synced = 0                    # highest seq known to be on disk
+        self._journal = None
+        self._thread = None
+        self._stopping = False
+
+        # --- Stats ---
+        self.submitted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.recovered = 0
+        self.duplicates = 0
+        self.dead = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    # --- Lifecycle ---
+    def use_journal(self, journal_path):
+        """Point the queue at another journal (before start(), e.g. one per server worker)."""
+        if self._thread is not None:
+            raise RuntimeError("write-behind queue already started")
+        self.journal_path = journal_path
+        self.checkpoint_path = journal_path + ".ckpt"
+        self.dead_letter_path = journal_path + ".dead"
+
+    def start(self):
+        """Replay the journal and start the flusher thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._recover()
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+            self._thread.start()
+        if self.recovered:
+            print(f"♻️ Recovered {self.recovered} queued submissions from {self.journal_path}.")
+
+    def stop(self, timeout=10.0):
+        """Flush what is queued and stop the flusher thread."""
+        with self._lock:
+            thread, self._stopping = self._thread, True
+            self._not_empty.notify()
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            self._thread = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    # --- Producer ---
+    def submit(self, table, columns, values):
+        """Journal one row for `table`; returns once it is on disk. Raises QueueFull when backpressure applies."""
+        if self._thread is None:
+            self.start()
+        columns, values = tuple(columns), tuple(values)
+        with self._lock:
+            if len(self._queue) >= self.max_depth:
+                self.rejected += 1
+                raise QueueFull(f"write-behind queue is full ({self.max_depth} rows)")
+            self._seq += 1
+            seq = self._seq
+            # Written under the lock so the journal stays in seq order (checkpoints rely on it);
+            # fsync happens outside it. The flusher may insert the row before that fsync
+            # returns, which only means a crash in between leaves it in MySQL, unacknowledged.
+            self._journal.write(json.dumps(
+                {"seq": seq, "table": table, "columns": columns, "values": values}, default=_encode,
+            ) + "\n")
+            self._journal.flush()
+            self._queue.append((seq, table, columns, values))
+            self.submitted += 1
+            if len(self._queue) >= self.batch_size:
+                self._not_empty.notify()
+        if self.fsync:
+            self._sync(seq)
+        return seq
+
+    def _sync(self, seq):
+        """Group commit: one thread fsyncs for everything written so far; the ones
+        that queued up behind it find their rows already covered and return."""
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target, journal = self._seq, self._journal
+            if journal is not None:
+                os.fsync(journal.fileno())
+            self._synced = target
+
+    # --- Flusher ---
+    def _run(self):
+        while True:
+            with self._lock:
+                # Flush when a full batch is queued or `flush_interval` has passed.
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_empty.wait(remaining)
+                batch = [self._queue[i] for i in range(min(self.batch_size, len(self._queue)))]
+                if not batch and self._stopping:
+                    return
+
+            if not batch:
+                continue
+            if self._flush(batch):
+                with self._lock:
+                    for _ in batch:
+                        self._queue.popleft()
+                    self._checkpoint(batch[-1][0])
+            elif self._stopping:
+                return
+            else:
+                time.sleep(self.retry_delay)
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        duplicates, dead = 0, []
+        inserted = {}  # {table: ([row dict], [id])}
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    for seq, table, columns, values in batch:
+                        placeholders = ", ".join(["%s"] * len(columns))
+                        try:
+                            cursor.execute(
+                                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", values,
+                            )
+                        except mysql.connector.Error as e:
+                            if e.errno == DUPLICATE:
+                                duplicates += 1
+                            elif e.errno in ROW_ERRORS:
+                                dead.append((seq, table, columns, values, str(e)))
+                            else:
+                                raise
+                        else:
+                            rows, ids = inserted.setdefault(table, ([], []))
+                            rows.append(dict(zip(columns, values)))
+                            ids.append(cursor.lastrowid)
+                    if self.enqueue is not None:
+                        # Only rows that were inserted, with their ids: an alert exists exactly when its row does.
+                        for table, (rows, ids) in inserted.items():
+                            self.enqueue(cursor, table, rows, ids)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            if dead:
+                self._dead_letter(dead)  # before the checkpoint: a crash here replays, never loses
+        except Exception as e:
+            self.failures += 1
+            print("❌ Write-Behind Flush Error:", e)
+            return False
+
+        elapsed = time.perf_counter() - started
+        self.flushed += len(batch) - duplicates - len(dead)
+        self.duplicates += duplicates
+        self.dead += len(dead)
+        self.batches += 1
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self.total_flush_seconds += elapsed
+        if self.on_commit is not None:
+            for table, (rows, ids) in inserted.items():
+                try:
+                    self.on_commit(table, rows, ids)
+                except Exception as e:
+                    print("❌ Write-Behind Commit Callback Error:", e)
+        return True
+
+    def _dead_letter(self, rows):
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for seq, table, columns, values, error in rows:
+                f.write(json.dumps(
+                    {"seq": seq, "table": table, "columns": columns, "values": values, "error": error},
+                    default=_encode,
+                ) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"❌ Write-Behind: {len(rows)} rows rejected by the database, kept in {self.dead_letter_path}.")
+
+    # --- Journal / checkpoint (callers hold self._lock) ---
+    def _checkpoint(self, seq):
+        self._committed = seq
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(seq))
+        os.replace(tmp, self.checkpoint_path)
+        if not self._queue and self._journal is not None:
+            # Everything journaled is committed: start a fresh journal.
+            self._journal.truncate(0)
+
+    def _recover(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                self._committed = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            self._committed = 0
+        self._seq = self._committed
+
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        pending = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn write at crash time
+            self._seq = max(self._seq, entry["seq"])
+            if entry["seq"] > self._committed:
+                values = tuple(_decode(value) for value in entry["values"])
+                pending.append((entry["seq"], entry["table"], tuple(entry["columns"]), values))
+
+        # Rewrite the journal with only the pending rows.
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            for seq, table, columns, values in pending:
+                f.write(json.dumps(
+                    {"seq": seq, "table": table, "columns": columns, "values": values}, default=_encode,
+                ) + "\n")
+        self._queue.extend(pending)
+        self._synced = self._seq
+        self.recovered = len(pending)
+
+    def stats(self):
+        """Snapshot of queue counters for monitoring."""
+        with self._lock:
+            depth = len(self._queue)
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "recovered": self.recovered,
+            "duplicates": self.duplicates,
+            "dead": self.dead,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+            "max_flush_seconds": round(self.max_flush_seconds, 6),
+            "avg_flush_seconds": round(self.total_flush_seconds / self.batches, 6) if self.batches else 0.0,
+        }
@@ -0,0 +1,118 @@
+# /backend/benchmarks/bench_asgi_vs_flask.py
+#
+# Drives /contact (or /request-service) on two running servers at the same
+# concurrency and compares throughput and latency. Start both first, e.g.:
+#
+#   python app.py                                   # Flask, port 5000
+#   PORT=5100 uvicorn backend.asgi:app --port 5100      # ASGI
+#   python benchmarks/bench_asgi_vs_flask.py --flask http://127.0.0.1:5000 --asgi http://127.0.0.1:5100
+#
+# Without a MySQL server, start both with STORAGE=sqlite SQLITE_PATH=/tmp/bench.sqlite3.
+#
+# Each request uses a fresh email and X-Forwarded-For address so the rate
+# limiter and cooldown never short-circuit the write path.
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+async def post(reader, writer, host, path, body):
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nX-Forwarded-For: {body_ip(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        name, value = name.lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return int(status_line.split()[1]), keep_alive
+
+
+def body_ip(body):
+    n = hash(body) & 0xFFFFFF
+    return f"10.{n >> 16}.{(n >> 8) & 255}.{n & 255}"
+
+
+def payload(endpoint, i, run_id):
+    email = f"bench{run_id}-{i}@example.com"
+    if endpoint == "/contact":
+        data = {"name": "Bench", "email": email, "message": f"benchmark message {i}"}
+    else:
+        data = {"name": "Bench", "email": email, "service": "Web Development", "budget": "1000"}
+    return json.dumps(data).encode()
+
+
+async def run(base_url, endpoint, concurrency, total):
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    run_id = int(time.time() * 1000)
+    latencies, statuses = [], {}
+    counter = iter(range(total))
+
+    async def worker():
+        writer = None
+        try:
+            for i in counter:
+                started = time.perf_counter()
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                status, keep_alive = await post(reader, writer, url.netloc, endpoint, payload(endpoint, i, run_id))
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(pct(50), 2),
+        "p95_ms": round(pct(95), 2),
+        "p99_ms": round(pct(99), 2),
+        "statuses": statuses,
+    }
+
+
+async def main(args):
+    results = {}
+    for name, base_url in (("flask", args.flask), ("asgi", args.asgi)):
+        if base_url:
+            results[name] = await run(base_url, args.endpoint, args.concurrency, args.requests)
+            print(f"{name:6} {json.dumps(results[name])}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flask", help="base URL of the Flask server")
+    parser.add_argument("--asgi", help="base URL of the ASGI server")
+    parser.add_argument("--endpoint", default="/contact", choices=["/contact", "/request-service"])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    asyncio.run(main(parser.parse_args()))
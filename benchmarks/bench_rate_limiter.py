@@ -0,0 +1,67 @@
+# /backend/benchmarks/bench_rate_limiter.py
+#
+# Microbenchmark for SlidingWindowLimiter: checks/sec and memory with 1M distinct IPs.
+#
+#   python benchmarks/bench_rate_limiter.py [--keys 1000000] [--max-keys 100000]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.rate_limiter import SlidingWindowLimiter
+
+
+def fake_ips(n):
+    return [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" if i < 1 << 24 else f"ip-{i}" for i in range(n)]
+
+
+def run(keys, max_keys, limit, hot_checks):
+    ips = fake_ips(keys)
+    limiter = SlidingWindowLimiter(limit, window=60, max_keys=max_keys)
+
+    # --- Distinct keys: every check inserts a new key (worst case for memory) ---
+    def fill(limiter):
+        now = 1000.0
+        for ip in ips:
+            limiter.hit(ip, now)
+            now += 0.00001
+        return now
+
+    start = time.perf_counter()
+    now = fill(limiter)
+    elapsed = time.perf_counter() - start
+    print(f"distinct keys : {keys:>10,} checks in {elapsed:6.2f}s -> {keys / elapsed:>12,.0f} checks/sec")
+    print(f"tracked keys  : {len(limiter):>10,} (cap {max_keys:,}, evicted {limiter.evictions:,})")
+
+    # Memory is measured on a second, traced run (tracing slows the checks down).
+    tracemalloc.start()
+    traced = SlidingWindowLimiter(limit, window=60, max_keys=max_keys)
+    fill(traced)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    print(f"limiter memory: {current / 2**20:>10.1f} MiB (peak {peak / 2**20:.1f} MiB)")
+
+    # --- Hot keys: repeated checks against a small working set ---
+    hot = ips[:1000]
+    start = time.perf_counter()
+    allowed = 0
+    for i in range(hot_checks):
+        allowed += limiter.hit(hot[i % 1000], now)
+    elapsed = time.perf_counter() - start
+    print(f"hot keys      : {hot_checks:>10,} checks in {elapsed:6.2f}s -> {hot_checks / elapsed:>12,.0f} checks/sec "
+          f"({allowed:,} allowed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--hot-checks", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.keys, args.max_keys, args.limit, args.hot_checks)
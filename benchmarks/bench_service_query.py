@@ -0,0 +1,167 @@
+# /backend/benchmarks/bench_service_query.py
+#
+# Dashboard query latency on a large service_requests table, before and
+# after the SERVICE_INDEXES composite indexes are created.
+#
+#   python benchmarks/bench_service_query.py --rows 10000000 --sqlite /tmp/svc.sqlite3 --output svc.json
+#   python benchmarks/bench_service_query.py --db sqlite --rows 10000000 --sqlite /tmp/svc.sqlite3   # STORAGE=sqlite
+#   python benchmarks/bench_service_query.py --db mysql --rows 10000000     # DB_HOST / DB_NAME ...
+#
+# The table is filled once with synthetic rows (reused on later runs) and each
+# query is timed through backend.service_query exactly as /admin/service-requests runs it.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+SERVICES = ("Web Development", "Mobile App", "UI/UX Design", "SEO", "Hosting", "Maintenance", "Consulting", "Other")
+TODAY = date(2025, 1, 1)
+
+QUERIES = {
+    "newest": {},
+    "service_newest": {"services": ["SEO"]},
+    "service_urgent_newest": {"services": ["Mobile App"], "priority_max": 2},
+    "deadline_window": {"deadline_from": datetime(2025, 1, 1), "deadline_to": datetime(2025, 1, 14),
+                        "sort": "deadline", "descending": False},
+    "service_budget_range": {"services": ["Web Development"], "budget_min": 20000, "budget_max": 30000,
+                             "sort": "budget"},
+    "urgent_newest": {"priority_max": 1},
+}
+
+
+core = query = decode_cursor = None  # imported by main() once the storage engine is chosen
+
+
+def fill(total, batch=10000, seed=42):
+    rng = random.Random(seed)
+    with core.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {core.SERVICE_TABLE}")
+        existing = cursor.fetchone()[0]
+        started = time.perf_counter()
+        for offset in range(existing, total, batch):
+            rows = []
+            for i in range(offset, min(offset + batch, total)):
+                created = datetime(2023, 1, 1) + timedelta(seconds=i * 63072000 // total)
+                rows.append((
+                    "Bench", f"user{i}@bench{i % 500}.example", None, rng.choice(SERVICES), None, None,
+                    rng.randint(1, 5),
+                    None if rng.random() < 0.2 else rng.randrange(100, 50000, 100),
+                    None, None, None,
+                    None if rng.random() < 0.3 else TODAY + timedelta(days=rng.randint(-180, 180)),
+                    created,
+                ))
+            cursor.executemany(
+                f"INSERT INTO {core.SERVICE_TABLE} (name, email, phone, service, sub_details, details, priority, "
+                "budget, platform, attachment_link, notes, deadline, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", rows)
+            conn.commit()
+            print(f"\r  inserted {offset + len(rows):,} / {total:,}", end="", file=sys.stderr)
+        cursor.close()
+    if total > existing:
+        print(f"\n  filled in {time.perf_counter() - started:.0f}s", file=sys.stderr)
+    return max(existing, total)
+
+
+def set_indexes(create, dialect):
+    from backend.db_schema import SERVICE_INDEXES
+    with core.get_db_connection() as conn:
+        cursor = conn.cursor()
+        for name, columns in SERVICE_INDEXES.items():
+            if dialect == "sqlite":
+                sql = (f"CREATE INDEX IF NOT EXISTS {name} ON {core.SERVICE_TABLE} ({', '.join(columns)})" if create
+                       else f"DROP INDEX IF EXISTS {name}")
+            else:
+                sql = (f"CREATE INDEX {name} ON {core.SERVICE_TABLE} ({', '.join(columns)})" if create
+                       else f"DROP INDEX {name} ON {core.SERVICE_TABLE}")
+            try:
+                cursor.execute(sql)
+            except mysql.connector.Error as e:
+                if e.errno not in (1061, 1091):  # duplicate key name / can't drop missing key
+                    raise
+        if dialect == "sqlite":
+            cursor.execute("ANALYZE")
+        conn.commit()
+        cursor.close()
+
+
+def time_queries(repeat):
+    results = {}
+    for name, params in QUERIES.items():
+        params = dict(params, limit=50)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows, next_cursor = query(core.get_db_connection, **params)
+            samples.append(time.perf_counter() - started)
+        # second page through the keyset cursor
+        page2 = []
+        for _ in range(repeat if next_cursor else 0):
+            started = time.perf_counter()
+            query(core.get_db_connection, **dict(params, cursor=decode_cursor(next_cursor)))
+            page2.append(time.perf_counter() - started)
+        samples.sort()
+        results[name] = {
+            "rows": len(rows),
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 3),
+            "page2_p50_ms": round(sorted(page2)[len(page2) // 2] * 1000, 3) if page2 else None,
+        }
+        print(f"    {name:22} p50 {results[name]['p50_ms']:>10.3f} ms  p95 {results[name]['p95_ms']:>10.3f} ms",
+              file=sys.stderr)
+    return results
+
+
+def main(args):
+    global core, query, decode_cursor
+    path = args.sqlite or os.path.join(tempfile.mkdtemp(prefix="bench-"), f"{args.db}.sqlite3")
+    # The engine is chosen from the environment when backend.core is imported.
+    os.environ["STORAGE"] = "sqlite" if args.db == "sqlite" else "mysql"
+    os.environ["SQLITE_PATH"] = path
+    from backend import core
+    from backend.service_query import decode_cursor, query
+    if args.db == "standin":
+        from mysql_standin import MySQLStandIn
+        core.db_pool.connect = MySQLStandIn(path).connect
+    elif args.db == "mysql":
+        from backend.migrations import migrate
+        migrate()
+    dialect = "mysql" if args.db == "mysql" else "sqlite"
+
+    rows = fill(args.rows)
+    results = {"config": {"db": args.db, "rows": rows, "repeat": args.repeat}}
+    print("  without indexes:", file=sys.stderr)
+    set_indexes(False, dialect)
+    results["before"] = time_queries(args.repeat)
+    print("  with SERVICE_INDEXES:", file=sys.stderr)
+    started = time.perf_counter()
+    set_indexes(True, dialect)
+    results["config"]["index_build_seconds"] = round(time.perf_counter() - started, 1)
+    results["after"] = time_queries(args.repeat)
+    results["speedup"] = {
+        name: round(results["before"][name]["p50_ms"] / max(results["after"][name]["p50_ms"], 1e-6), 1)
+        for name in QUERIES
+    }
+    print(json.dumps(results["speedup"]))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default="standin", choices=["standin", "sqlite", "mysql"])
+    parser.add_argument("--sqlite", help="SQLite database file for standin / sqlite (reused between runs)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+# /backend/benchmarks/bench_spam_filter.py
+#
+# Bot-flood simulation for the spam pipeline: a mix of honeypot hits,
+# blocklisted networks, disposable domains, link spam and legitimate
+# submissions is pushed through core.spam_filters, with the MX lookup and the
+# cooldown lookup replaced by counters, to show how much DNS / MySQL work the
+# cheap checks save and what each check costs.
+#
+#   python benchmarks/bench_spam_filter.py [--submissions 200000] [--blocklist 50000] [--output spam.json]
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import core
+from backend.config import IP_LIMIT
+from backend.forms import parse_contact
+from backend.rate_limiter import SlidingWindowLimiter
+from backend.spam_filter import Submission
+
+KINDS = {
+    # kind: (share of traffic, payload, ip)
+    "honeypot": (0.30, {"website": "http://casino.example"}, None),
+    "blocklisted": (0.25, {}, "203.0.113.{n}"),
+    "disposable": (0.15, {"email": "bot{n}@mailinator.com"}, None),
+    "links": (0.15, {"message": "http://a.example http://b.example http://c.example http://d.example"}, None),
+    "legitimate": (0.15, {}, None),
+}
+
+
+def payloads(count, rng):
+    kinds = list(KINDS)
+    weights = [KINDS[kind][0] for kind in kinds]
+    for n in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        _, extra, ip = KINDS[kind]
+        data = {"name": "Visitor", "email": f"user{n}@example.com", "message": "Hello, I'd like a quote."}
+        data.update({key: value.format(n=n) for key, value in extra.items()})
+        address = ip.format(n=n % 250) if ip else f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+        yield kind, data, address
+
+
+def main(args):
+    rng = random.Random(1)
+    for i in range(args.blocklist):
+        core.ip_blocklist.add(f"{rng.randrange(1, 223)}.{rng.randrange(256)}.{rng.randrange(256)}.0/24")
+    core.ip_blocklist.add("203.0.113.0/24")
+
+    calls = {"mx": 0, "cooldown": 0}
+
+    def has_mx(domain):
+        calls["mx"] += 1
+        return True
+
+    def last_submission(email, now=None):
+        calls["cooldown"] += 1
+        return None
+
+    core.mx_cache.has_mx = has_mx
+    for cooldown in core.email_cooldowns.values():
+        cooldown.last_submission = last_submission
+    core.ip_limiter = SlidingWindowLimiter(IP_LIMIT, window=60, max_keys=args.submissions)  # in memory, whatever RATE_LIMIT_BACKEND says
+    spam_filter = core.spam_filters[core.CONTACT_TABLE]
+
+    submissions = [(kind, Submission(core.CONTACT_TABLE, ip, data, parse_contact(data)))
+                   for kind, data, ip in payloads(args.submissions, rng)]
+    per_kind = {kind: [0, 0.0] for kind in KINDS}
+    start = time.perf_counter()
+    for kind, submission in submissions:
+        t = time.perf_counter()
+        spam_filter.run(submission)
+        per_kind[kind][0] += 1
+        per_kind[kind][1] += time.perf_counter() - t
+    elapsed = time.perf_counter() - start
+
+    results = {
+        "config": {"submissions": args.submissions, "blocklist": len(core.ip_blocklist), "python": sys.version.split()[0]},
+        "submissions_per_sec": round(args.submissions / elapsed),
+        "expensive_calls": calls,
+        "kinds": {kind: {"count": n, "mean_us": round(total / n * 1e6, 2)} for kind, (n, total) in per_kind.items() if n},
+        "checks": spam_filter.stats()["checks"],
+    }
+    print(f"{args.submissions:,} submissions in {elapsed:.2f}s -> {results['submissions_per_sec']:,}/sec "
+          f"({len(core.ip_blocklist):,} blocked networks)")
+    for kind, r in results["kinds"].items():
+        print(f"    {kind:12} {r['count']:>8,}  mean {r['mean_us']:6.2f} us")
+    for check in results["checks"]:
+        print(f"    {check['name']:18} cost {check['cost']:>3}  reached {check['reached']:>8,}  rejected {check['rejected']:>8,}")
+    print(f"MX lookups: {calls['mx']:,}  cooldown lookups: {calls['cooldown']:,} "
+          f"(without the pipeline: {args.submissions:,} each)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=200000)
+    parser.add_argument("--blocklist", type=int, default=50000, help="random /24 networks added to the blocklist")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,192 @@
+# /backend/benchmarks/bench_submissions.py
+#
+# In-process load test for /contact and /request-service: drives the Flask
+# app from a thread pool and reports requests/sec, p50/p95/p99 latency and
+# per-stage time (validation, dns, rate_limit, cooldown, connect, insert, recent).
+#
+# Runs offline: DNS is stubbed, and the storage engine is picked with --db:
+#   sqlite    the embedded engine (STORAGE=sqlite: WAL file, batching writer thread)
+#   standin   the MySQL code path (pool + per-request transactions) over SQLite
+#             connections (benchmarks/mysql_standin.py); the default
+#   mysql     the server configured by DB_HOST / DB_USER / DB_PASS / DB_NAME
+#
+#   python benchmarks/bench_submissions.py --concurrency 16 --requests 5000 --output results.json
+#   python benchmarks/bench_submissions.py --db sqlite --concurrency 16 --requests 5000
+#
+# Each request uses a fresh email and X-Forwarded-For address so the rate
+# limiter and cooldown never short-circuit the write path.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = ("/contact", "/request-service")
+
+
+class StubResolver:
+    """dns.resolver.Resolver stand-in: every domain has MX, after `latency` seconds."""
+
+    class Answer:
+        class rrset:
+            ttl = 3600
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lookups = 0
+
+    def resolve(self, domain, rdtype, lifetime=None):
+        self.lookups += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.Answer()
+
+
+class StageTimes:
+    """timing observer collecting every stage duration."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def __call__(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self.samples = {}
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pct = lambda p: samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+        "p50_ms": round(pct(50), 4),
+        "p95_ms": round(pct(95), 4),
+        "p99_ms": round(pct(99), 4),
+    }
+
+
+def payload(endpoint, i, run_id, domains):
+    email = f"bench{run_id}-{i}@bench{i % domains}.example"
+    if endpoint == "/contact":
+        return {"name": "Bench", "email": email, "message": f"benchmark message {i}"}
+    return {"name": "Bench", "email": email, "service": "Web Development", "budget": "1000", "priority": 2}
+
+
+def client_ip(i):
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def run(app, endpoint, concurrency, total, recent, domains, stages):
+    run_id = int(time.time() * 1000)
+    path = endpoint + ("?recent=1" if recent else "")
+    local = threading.local()
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        body = payload(endpoint, i, run_id, domains)
+        started = time.perf_counter()
+        response = client.post(path, json=body, headers={"X-Forwarded-For": client_ip(i)})
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    stages.clear()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "statuses": statuses,
+    }
+    result.update({k: v for k, v in percentiles(latencies).items() if k != "count"})
+    result["stages"] = {name: percentiles(samples) for name, samples in sorted(stages.samples.items())}
+    return result
+
+
+def main(args):
+    path = args.sqlite or os.path.join(tempfile.mkdtemp(prefix="bench-"), f"{args.db}.sqlite3")
+    # The engine is chosen from the environment when backend.core is imported.
+    os.environ["STORAGE"] = "sqlite" if args.db == "sqlite" else "mysql"
+    os.environ["SQLITE_PATH"] = path
+    from backend import core, create_app, timing
+    if args.db == "standin":
+        from mysql_standin import MySQLStandIn
+        core.db_pool.connect = MySQLStandIn(path).connect
+    elif args.db == "mysql":
+        from backend.migrations import migrate
+        migrate()
+    core.mx_cache.resolver = StubResolver(args.dns_latency / 1000)
+
+    app = create_app(["contact", "request-service"])
+    stages = StageTimes()
+    timing.add_observer(stages)
+
+    results = {
+        "config": {
+            "db": args.db,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "recent": args.recent,
+            "dns_latency_ms": args.dns_latency,
+            "domains": args.domains,
+            "storage": core.storage.name,
+            "pool_max": core.db_pool.max_size if core.storage.name == "mysql" else None,
+            "python": sys.version.split()[0],
+        },
+    }
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):  # per-submission log lines
+        core.warm(start_write_behind=True)
+        for endpoint in args.endpoint or ENDPOINTS:
+            results[endpoint] = run(app, endpoint, args.concurrency, args.requests, args.recent, args.domains, stages)
+        core.write_behind.stop()  # drain queued rows in WRITE_BEHIND=1 runs
+        results["storage"] = core.storage.stats()
+        core.storage.close()
+
+    for endpoint in args.endpoint or ENDPOINTS:
+        r = results[endpoint]
+        print(f"{endpoint:17} {r['rps']:>9} req/s  p50 {r['p50_ms']:.2f} ms  p95 {r['p95_ms']:.2f} ms  "
+              f"p99 {r['p99_ms']:.2f} ms  {r['statuses']}")
+        for name, s in r["stages"].items():
+            print(f"    {name:11} mean {s['mean_ms']:.3f} ms  p99 {s['p99_ms']:.3f} ms  (n={s['count']})")
+    if core.storage.name == "sqlite":
+        s = results["storage"]
+        print(f"sqlite writer: {s['batches']} transactions, {s['avg_batch']} rows avg ({s['max_batch']} max), "
+              f"{s['avg_commit_seconds'] * 1000:.3f} ms avg")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoint", action="append", choices=ENDPOINTS, help="repeatable; default: both")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--db", default="standin", choices=["standin", "sqlite", "mysql"])
+    parser.add_argument("--sqlite", help="SQLite database file for standin / sqlite (default: fresh temp file)")
+    parser.add_argument("--recent", action="store_true", help="request ?recent=1 on every submission")
+    parser.add_argument("--dns-latency", type=float, default=0.0, help="simulated MX lookup time in ms")
+    parser.add_argument("--domains", type=int, default=100, help="distinct email domains (MX cache misses)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
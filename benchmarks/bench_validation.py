@@ -0,0 +1,91 @@
+# /backend/benchmarks/bench_validation.py
+#
+# Microbenchmark for backend.forms: cost per payload of the /contact and
+# /request-service schemas on valid and rejected input, plus the full
+# Flask round trip for payloads that must be refused before DNS or MySQL.
+#
+#   python benchmarks/bench_validation.py [--number 200000] [--output validation.json]
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import create_app
+from backend.config import MAX_BODY_BYTES
+from backend.forms import FormError, parse_contact, parse_service_request
+
+CONTACT = {"name": "Ada Lovelace", "email": "ada@example.com", "message": "Hello! I'd like a quote for a website."}
+SERVICE = {"name": "Ada Lovelace", "email": "ada@example.com", "phone": "+44 20 7946 0000", "service": "Web Development",
+           "sub_details": "Landing page", "details": "Three pages and a contact form.", "priority": "2",
+           "budget": "1500", "platform": "WordPress", "attachment_link": "", "notes": "", "deadline": "2025-03-01"}
+
+CASES = {
+    "contact_valid": (parse_contact, CONTACT),
+    "contact_missing": (parse_contact, {**CONTACT, "message": "  "}),
+    "contact_not_object": (parse_contact, ["not", "an", "object"]),
+    "contact_too_long": (parse_contact, {**CONTACT, "name": "x" * 1000}),
+    "service_valid": (parse_service_request, SERVICE),
+    "service_minimal": (parse_service_request, {"name": "Ada", "email": "ada@example.com", "service": "SEO"}),
+    "service_bad_priority": (parse_service_request, {**SERVICE, "priority": "9"}),
+    "service_bad_deadline": (parse_service_request, {**SERVICE, "deadline": "next week"}),
+}
+
+
+def time_parse(parse, payload, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        try:
+            parse(payload)
+        except FormError:
+            pass
+    return (time.perf_counter() - start) / number * 1e9
+
+
+def time_requests(client, path, body, number):
+    statuses = {}
+    start = time.perf_counter()
+    for _ in range(number):
+        status = client.post(path, data=body, content_type="application/json").status_code
+        statuses[status] = statuses.get(status, 0) + 1
+    return (time.perf_counter() - start) / number * 1e6, statuses
+
+
+def main(args):
+    results = {"config": {"number": args.number, "max_body_bytes": MAX_BODY_BYTES, "python": sys.version.split()[0]}}
+
+    # --- Schema parsing ---
+    for name, (parse, payload) in CASES.items():
+        ns = time_parse(parse, payload, args.number)
+        results[name] = {"ns_per_op": round(ns)}
+        print(f"{name:22} {ns:>8,.0f} ns/op")
+
+    # --- Full requests rejected before DNS / MySQL (no database needed) ---
+    client = create_app().test_client()
+    requests = {
+        "http_oversized": ("/contact", b'{"message": "' + b"x" * (MAX_BODY_BYTES + 1) + b'"}'),
+        "http_malformed": ("/contact", b'{"name": '),
+        "http_missing": ("/request-service", json.dumps({"name": "Ada"}).encode()),
+    }
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for name, (path, body) in requests.items():
+            us, statuses = time_requests(client, path, body, args.requests)
+            results[name] = {"us_per_request": round(us, 1), "statuses": statuses}
+    for name in requests:
+        print(f"{name:22} {results[name]['us_per_request']:>8,.1f} us/request  {results[name]['statuses']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200000, help="parses per schema case")
+    parser.add_argument("--requests", type=int, default=2000, help="test-client requests per HTTP case")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    main(parser.parse_args())
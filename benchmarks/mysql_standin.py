@@ -0,0 +1,32 @@
+# /backend/benchmarks/mysql_standin.py
+#
+# Embedded stand-in for MySQL so the MySQL code path (ConnectionPool +
+# MySQLStorage) can be benchmarked on a box without a database server. The
+# connections are backend.storage's mysql.connector-style SQLite wrappers
+# (%s placeholders, INSERT IGNORE, cursor(dictionary=True), ping(), errno
+# 1062 on duplicates). For the embedded engine itself use STORAGE=sqlite.
+#
+#   standin = MySQLStandIn("/tmp/bench.sqlite3")
+#   core.db_pool.connect = standin.connect
+
+import threading
+
+from backend.db_schema import SQLITE_SCHEMA as SCHEMA
+from backend.storage import SQLiteConnection, connect_sqlite
+
+
+class MySQLStandIn:
+    """Factory for stand-in connections sharing one SQLite database file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.connections = 0
+        conn = connect_sqlite(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def connect(self):
+        with self._lock:
+            self.connections += 1
+        return SQLiteConnection(connect_sqlite(self.path))
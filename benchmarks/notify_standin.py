@@ -0,0 +1,191 @@
+# /backend/benchmarks/notify_standin.py
+#
+# Local stand-ins for the notification channels: an HTTP server that accepts
+# webhook POSTs and a minimal SMTP server that accepts mail, both recording
+# what they receive. Failures and latency can be injected to exercise the
+# dispatcher's retry / backoff path.
+#
+#   python benchmarks/notify_standin.py --http 8025 --smtp 2525 --fail-rate 0.2
+#   NOTIFY_WEBHOOK_URL=http://127.0.0.1:8025/hook \
+#   NOTIFY_SMTP_HOST=127.0.0.1 NOTIFY_SMTP_PORT=2525 NOTIFY_SMTP_STARTTLS=0 NOTIFY_TO=sales@example.com python app.py
+#
+# In-process use:
+#   hook = WebhookStandIn().start();  smtp = SMTPStandIn().start()
+#   ... hook.url, smtp.port, hook.events, smtp.messages ...
+
+import argparse
+import json
+import random
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Faults:
+    def __init__(self, fail_rate=0.0, latency=0.0, seed=None):
+        self.fail_rate = fail_rate
+        self.latency = latency            # seconds added to every request / message
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_fail(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            return self._random.random() < self.fail_rate
+
+
+# --- Webhook ---
+class WebhookStandIn(_Faults):
+    """Records every event of every accepted POST in `events`; failed POSTs get a 503."""
+
+    def __init__(self, host="127.0.0.1", port=0, **faults):
+        super().__init__(**faults)
+        self.events = []
+        self.requests = 0
+        self.failures = 0
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with standin._lock:
+                    standin.requests += 1
+                if standin.should_fail():
+                    with standin._lock:
+                        standin.failures += 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                events = json.loads(body).get("events", [])
+                with standin._lock:
+                    standin.events.extend(events)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}/hook"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="webhook-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# --- SMTP ---
+class SMTPStandIn(_Faults):
+    """Just enough SMTP (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) to accept smtplib mail.
+
+    Accepted messages are parsed into email.message.EmailMessage objects in
+    `messages`; a failed message is answered with 451 (temporary failure).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **faults):
+        super().__init__(**faults)
+        self.messages = []
+        self.failures = 0
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                self.reply("220 notify-standin ESMTP")
+                recipients = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode("ascii", "replace").strip()
+                    verb = command[:4].upper()
+                    if verb == "EHLO":
+                        self.reply("250-notify-standin")
+                        self.reply("250 8BITMIME")
+                    elif verb == "HELO":
+                        self.reply("250 notify-standin")
+                    elif verb == "MAIL":
+                        recipients = []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(command.split(":", 1)[1].strip(" <>"))
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = bytearray()
+                        for raw in iter(self.rfile.readline, b""):
+                            if raw in (b".\r\n", b".\n"):
+                                break
+                            data += raw[1:] if raw.startswith(b"..") else raw
+                        if standin.should_fail():
+                            with standin._lock:
+                                standin.failures += 1
+                            self.reply("451 Try again later")
+                            continue
+                        message = message_from_bytes(bytes(data), policy=default_policy)
+                        with standin._lock:
+                            standin.messages.append((tuple(recipients), message))
+                        self.reply("250 OK")
+                    elif verb in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server((host, port), Handler)
+        self.host = host
+        self.port = self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="smtp-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local webhook / SMTP stand-ins for notification testing.")
+    parser.add_argument("--http", type=int, default=8025, help="webhook port (0 = off)")
+    parser.add_argument("--smtp", type=int, default=2525, help="SMTP port (0 = off)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests / messages to refuse")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each delivery")
+    args = parser.parse_args()
+
+    faults = {"fail_rate": args.fail_rate, "latency": args.latency}
+    hook = WebhookStandIn(port=args.http, **faults).start() if args.http else None
+    smtp = SMTPStandIn(port=args.smtp, **faults).start() if args.smtp else None
+    if hook:
+        print(f"✅ Webhook stand-in on {hook.url}")
+    if smtp:
+        print(f"✅ SMTP stand-in on {smtp.host}:{smtp.port}")
+    seen_events = seen_messages = 0
+    try:
+        while True:
+            time.sleep(1)
+            if hook and len(hook.events) > seen_events:
+                for e in hook.events[seen_events:]:
+                    print(f"📩 webhook: {e.get('event')} #{e.get('id')} (notification {e.get('notification_id')})")
+                seen_events = len(hook.events)
+            if smtp and len(smtp.messages) > seen_messages:
+                for recipients, message in smtp.messages[seen_messages:]:
+                    print(f"📩 smtp to {', '.join(recipients)}: {message['Subject']}")
+                seen_messages = len(smtp.messages)
+    except KeyboardInterrupt:
+        pass
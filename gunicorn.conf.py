@@ -0,0 +1,9 @@
+# /gunicorn.conf.py
+#
+# Read by `gunicorn app:app` (or server:app, service_requests:app) from the
+# project root; the settings and hooks live in backend/serve.py.
+
+from backend.serve import (  # noqa: F401
+    bind, graceful_timeout, keepalive, on_exit, on_starting, post_fork, preload_app, threads, timeout, worker_class,
+    worker_exit, workers,
+)
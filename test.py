@@ -1,36 +1,37 @@
-import mysql.connector
-import os
+import argparse
+import sys
 
-# DB config
-DB_HOST = os.environ.get("DB_HOST", "localhost")
-DB_USER = os.environ.get("DB_USER", "root")
-DB_PASS = os.environ.get("DB_PASS", "")
-DB_NAME = os.environ.get("DB_NAME", "mini_browser")
+from backend import core
+from backend.export import EXPORT_COLUMNS, FORMATS, ExportError, export, parse_datetime
 
-# Connect to DB
-conn = mysql.connector.connect(
-    host=DB_HOST,
-    user=DB_USER,
-    password=DB_PASS,
-    database=DB_NAME
-)
+# Streams tables to stdout in keyset-paginated batches, so memory stays flat
+# however many rows there are:
+#
+#   python test.py                                   # every exportable table, NDJSON
+#   python test.py service_requests --format csv --since 2024-01-01 --service "Web Development" > out.csv
 
-cursor = conn.cursor()
+parser = argparse.ArgumentParser()
+parser.add_argument("tables", nargs="*", default=list(EXPORT_COLUMNS), help=f"default: every exportable table ({', '.join(EXPORT_COLUMNS)})")
+parser.add_argument("--format", default="ndjson", choices=list(FORMATS))
+parser.add_argument("--since", help="created_at >= (YYYY-MM-DD or ISO datetime)")
+parser.add_argument("--until", help="created_at < (YYYY-MM-DD or ISO datetime)")
+parser.add_argument("--service", help="service_requests only")
+parser.add_argument("--batch", type=int, default=1000, help="rows per query")
+args = parser.parse_args()
 
-# Get all tables
-cursor.execute("SHOW TABLES;")
-tables = cursor.fetchall()
-
-for (table_name,) in tables:
-    print(f"\nData from table `{table_name}`:")
-    cursor.execute(f"SELECT * FROM `{table_name}`;")
-    rows = cursor.fetchall()
-    if rows:
-        for row in rows:
-            print(row)
-    else:
-        print("No data found.")
-
-# Close connection
-cursor.close()
-conn.close()
+try:
+    for table_name in args.tables:
+        print(f"Data from table `{table_name}`:", file=sys.stderr)
+        chunks = export(
+            core.storage, table_name, args.format,
+            since=parse_datetime(args.since, "since"),
+            until=parse_datetime(args.until, "until"),
+            service=args.service if table_name == core.SERVICE_TABLE else None,
+            batch_size=args.batch,
+        )
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+except ExportError as e:
+    sys.exit(f"❌ {e.message}")
+finally:
+    core.storage.close()